@@ -4,15 +4,11 @@ Apify Actor for HTML cleaning.
 This actor takes HTML content and cleans it by removing specified tags and attributes.
 """
 
-import os
-import sys
 import json
+import hashlib
 from apify import Actor
 
-# Add the shared directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
-
-from utils import clean_html
+from shared.utils import clean_html
 
 
 async def main():
@@ -29,27 +25,45 @@ async def main():
             await Actor.fail('Missing required parameter: html')
             return
         
-        # Get optional cleaning parameters (using camelCase as per input schema)
-        tags_to_remove = actor_input.get('unwantedTags', [])
-        attributes_to_remove = actor_input.get('unwantedAttrs', [])
+        # Get optional cleaning parameters (camelCase as per input schema,
+        # snake_case as used by the other actors)
+        tags_to_remove = (
+            actor_input.get('unwantedTags')
+            or actor_input.get('tags_to_remove')
+            or []
+        )
+        attributes_to_remove = (
+            actor_input.get('unwantedAttrs')
+            or actor_input.get('attributes_to_remove')
+            or []
+        )
         detect_article = actor_input.get('detectArticle', True)
+        include_original = actor_input.get('includeOriginal', False)
+        
+        # Describe the input cheaply instead of echoing it back in the output
+        original_html = html_content
+        original_info = {
+            'original_length': len(original_html),
+            'original_sha1': hashlib.sha1(
+                original_html.encode('utf-8', errors='ignore')
+            ).hexdigest()
+        }
+        if include_original:
+            original_info['original_html'] = original_html
         
         try:
-            # Extract article content if requested
-            if detect_article:
-                from utils import extract_article_content
-                html_content = extract_article_content(html_content)
-            
-            # Use shared utility to clean HTML
+            # Use shared utility to clean HTML, parsing it once and keeping
+            # only the article content if requested
             cleaned_html = clean_html(
                 html_content, 
                 unwanted_tags=tags_to_remove,
-                unwanted_attrs=attributes_to_remove
+                unwanted_attrs=attributes_to_remove,
+                detect_article=detect_article
             )
             
             # Push result to dataset
             await Actor.push_data({
-                'original_html': html_content,
+                **original_info,
                 'cleaned_html': cleaned_html,
                 'tags_removed': tags_to_remove,
                 'attributes_removed': attributes_to_remove,
@@ -64,7 +78,7 @@ async def main():
             
             # Push error result to dataset
             await Actor.push_data({
-                'original_html': html_content,
+                **original_info,
                 'cleaned_html': None,
                 'success': False,
                 'error': str(e)
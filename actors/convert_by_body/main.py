@@ -4,15 +4,11 @@ Apify Actor for content body to Markdown conversion.
 This actor takes HTML or text content and converts it to Markdown format.
 """
 
-import os
-import sys
 import json
+import hashlib
 from apify import Actor
 
-# Add the shared directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
-
-from conversion_utils import convert_body_to_markdown
+from shared.conversion_utils import convert_body_to_markdown
 
 
 async def main():
@@ -33,6 +29,17 @@ async def main():
         content_type = actor_input.get('content_type', 'text/html')
         tags_to_remove = actor_input.get('tags_to_remove', [])
         attributes_to_remove = actor_input.get('attributes_to_remove', [])
+        include_original = actor_input.get('includeOriginal', False)
+        
+        # Describe the input cheaply instead of echoing it back in the output
+        original_info = {
+            'original_length': len(content),
+            'original_sha1': hashlib.sha1(
+                content.encode('utf-8', errors='ignore')
+            ).hexdigest()
+        }
+        if include_original:
+            original_info['original_content'] = content
         
         try:
             # Use shared utility to convert content to Markdown
@@ -45,7 +52,7 @@ async def main():
             
             # Push result to dataset
             await Actor.push_data({
-                'original_content': content,
+                **original_info,
                 'content_type': content_type,
                 'markdown': markdown_content,
                 'tags_removed': tags_to_remove,
@@ -61,7 +68,7 @@ async def main():
             
             # Push error result to dataset
             await Actor.push_data({
-                'original_content': content,
+                **original_info,
                 'content_type': content_type,
                 'markdown': None,
                 'success': False,
@@ -4,15 +4,10 @@ Apify Actor for URL to Markdown conversion.
 This actor takes a URL and converts its content to Markdown format.
 """
 
-import os
-import sys
 import json
 from apify import Actor
 
-# Add the shared directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
-
-from conversion_utils import convert_url_to_markdown
+from shared.conversion_utils import convert_url_to_markdown
 
 
 async def main():
@@ -4,15 +4,10 @@ Apify Actor for URL dereferencing.
 This actor takes a URL and follows redirects to get the final destination URL.
 """
 
-import os
-import sys
 import json
 from apify import Actor
 
-# Add the shared directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
-
-from conversion_utils import dereference_url
+from shared.conversion_utils import dereference_url
 
 
 async def main():
@@ -38,20 +38,6 @@ for actor in $ACTORS; do
     echo "Copying shared code to $actor_dir/shared"
     cp -r /workspace/shared "$actor_dir/shared"
     
-    # Modify main.py to use local shared directory
-    main_py="$actor_dir/main.py"
-    if [ -f "$main_py" ]; then
-        echo "Modifying imports in $main_py"
-        
-        # Create backup
-        cp "$main_py" "$main_py.backup"
-        
-        # Replace sys.path.append line to use local shared directory
-        sed -i "s|sys\.path\.append(os\.path\.join(os\.path\.dirname(__file__), '\.\.', '\.\.', 'shared'))|sys.path.append(os.path.join(os.path.dirname(__file__), 'shared'))|g" "$main_py"
-        
-        echo "Modified imports in $main_py"
-    fi
-    
     # Copy root requirements.txt if actor doesn't have one
     if [ ! -f "$actor_dir/requirements.txt" ] && [ -f "/workspace/requirements.txt" ]; then
         echo "Copying root requirements.txt to $actor_dir"
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Gunicorn configuration for the Flask server.
+Threaded workers let browser and network waits of concurrent requests overlap.
+"""
+
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}"
+
+# Fetches mostly wait on I/O, so threads scale well within a worker and share
+# its browser pool and HTTP connections
+worker_class = 'gthread'
+workers = int(os.getenv('WORKERS', '2'))
+threads = int(os.getenv('THREADS', '16'))
+
+# Import the app once in the master; browsers and on-disk caches are still
+# opened lazily in each worker after the fork
+preload_app = True
+
+# Browser fallbacks can take well over the default 30 seconds
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
@@ -3,11 +3,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import os
+import gzip
+import zlib
 import logging
+from werkzeug.exceptions import BadRequest, HTTPException, RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 from shared.utils import is_html_content, extract_article_content, clean_html
-from shared.conversion_utils import dereference_url, convert_url_to_markdown, convert_body_to_markdown
+from shared.conversion_utils import (
+    dereference_url, convert_url_to_markdown, convert_urls_to_markdown,
+    convert_body_to_markdown
+)
 from shared.browser_utils import fetch_with_browser_fallback
 
 # Try to import brotli, but don't fail if it's not available
@@ -17,6 +24,20 @@ try:
 except ImportError:
     BROTLI_AVAILABLE = False
 
+# brotli 1.2.0 added output limits to Decompressor.process; older versions
+# are fed small input chunks instead
+BROTLI_OUTPUT_LIMIT_AVAILABLE = BROTLI_AVAILABLE and hasattr(
+    brotli.Decompressor, 'can_accept_more_data'
+)
+BROTLI_INPUT_CHUNK_SIZE = 1024
+
+# Try to import orjson for faster JSON responses, fall back to the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 # Get log level from environment variable, default to INFO
 log_level_str = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -36,15 +57,172 @@ logging.getLogger('selenium').setLevel(logging.WARNING)
 logging.getLogger('werkzeug').setLevel(logging.INFO)
 logging.getLogger('markitdown').setLevel(log_level)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Write orjson's bytes straight into the response without a str copy
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 logger = logging.getLogger(__name__)
 
+# Responses smaller than this are sent uncompressed
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+
+# Largest request body accepted, before and after decompression; 0 disables
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(100 * 1024 * 1024)))
+
+# Largest number of URLs accepted by /convert-by-urls in one request
+MAX_BATCH_URLS = int(os.getenv('MAX_BATCH_URLS', '100'))
+
+# Werkzeug also enforces the limit on chunked bodies without Content-Length
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE or None
+
+# Errors raised for corrupt compressed request bodies
+DECOMPRESSION_ERRORS = (zlib.error, brotli.error) if BROTLI_AVAILABLE else (zlib.error,)
+
 # All utility functions moved to shared modules
 
+@app.before_request
+def reject_oversized_body():
+    """Refuse bodies announced as too large before any of them is read"""
+    if MAX_UPLOAD_SIZE and (request.content_length or 0) > MAX_UPLOAD_SIZE:
+        return jsonify({'error': 'Request body too large'}), 413
+
+@app.errorhandler(BadRequest)
+@app.errorhandler(RequestEntityTooLarge)
+def handle_body_error(error):
+    """Report unreadable or oversized request bodies as JSON"""
+    return jsonify({'error': error.description}), error.code
+
+def _decompress_limited(body, wbits):
+    """Inflate a gzip or zlib body without growing past MAX_UPLOAD_SIZE"""
+    decompressor = zlib.decompressobj(wbits)
+    # max_length of 0 means unlimited
+    data = decompressor.decompress(body, MAX_UPLOAD_SIZE + 1 if MAX_UPLOAD_SIZE else 0)
+    if MAX_UPLOAD_SIZE and len(data) > MAX_UPLOAD_SIZE:
+        raise RequestEntityTooLarge('Decompressed request body too large')
+    if not decompressor.eof:
+        raise BadRequest('Truncated compressed request body')
+    return data
+
+def _brotli_decompress_limited(body):
+    """Decompress a brotli body without growing past MAX_UPLOAD_SIZE"""
+    if not MAX_UPLOAD_SIZE:
+        return brotli.decompress(body)
+    decompressor = brotli.Decompressor()
+    # The output buffer stops growing once it reaches the limit, so a small
+    # body that expands to gigabytes is rejected after a few MB
+    if BROTLI_OUTPUT_LIMIT_AVAILABLE:
+        data = decompressor.process(body, output_buffer_limit=MAX_UPLOAD_SIZE + 1)
+        if len(data) > MAX_UPLOAD_SIZE or not decompressor.can_accept_more_data():
+            raise RequestEntityTooLarge('Decompressed request body too large')
+    else:
+        # Older brotli can't limit its output; feed the body in small chunks
+        # and check the size after each, so only the expansion of a single
+        # chunk can go past the limit
+        parts = []
+        size = 0
+        for start in range(0, len(body), BROTLI_INPUT_CHUNK_SIZE):
+            part = decompressor.process(body[start:start + BROTLI_INPUT_CHUNK_SIZE])
+            size += len(part)
+            if size > MAX_UPLOAD_SIZE:
+                raise RequestEntityTooLarge('Decompressed request body too large')
+            parts.append(part)
+        data = b''.join(parts)
+    if not decompressor.is_finished():
+        raise BadRequest('Truncated compressed request body')
+    return data
+
+def read_request_body():
+    """
+    Read the request body once, undoing any Content-Encoding set by the client.
+    
+    Returns:
+        bytes or None: Decoded body, or None if the encoding is not supported
+    
+    Raises:
+        RequestEntityTooLarge: If the body is larger than MAX_UPLOAD_SIZE
+        BadRequest: If the body is not valid for its Content-Encoding
+    """
+    # Read the body without Werkzeug keeping its own copy
+    body = request.get_data(cache=False)
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    
+    if not body or encoding in ('', 'identity'):
+        return body
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            return _decompress_limited(body, 16 + zlib.MAX_WBITS)
+        if encoding == 'deflate':
+            return _decompress_limited(body, zlib.MAX_WBITS)
+        if encoding == 'br' and BROTLI_AVAILABLE:
+            return _brotli_decompress_limited(body)
+    except DECOMPRESSION_ERRORS:
+        raise BadRequest('Invalid compressed request body')
+    return None
+
+def read_json_body():
+    """
+    Parse the JSON request body with the app's JSON provider (orjson when available).
+    
+    Returns:
+        object or None: Parsed body, or None if it is missing, uses an
+            unsupported Content-Encoding or is not valid JSON
+    
+    Raises:
+        RequestEntityTooLarge: If the body is larger than MAX_UPLOAD_SIZE
+        BadRequest: If the body is not valid for its Content-Encoding
+    """
+    try:
+        body = read_request_body()
+        if not body:
+            return None
+        return app.json.loads(body)
+    except ValueError:
+        return None
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON responses with brotli or gzip when the client accepts it"""
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype != 'application/json'):
+        return response
+
+    data = response.get_data()
+    if len(data) < RESPONSE_COMPRESSION_MIN_SIZE:
+        return response
+
+    # Level 5 gets most of the size reduction of the maximum levels at a
+    # fraction of the CPU cost, which matters for large markdown bodies
+    if BROTLI_AVAILABLE and request.accept_encodings['br']:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 @app.route('/clean-html', methods=['POST'])
 def route_clean_html():
     try:
-        if not request.data:
+        body = read_request_body()
+        if body is None:
+            return jsonify({'error': 'Unsupported Content-Encoding'}), 415
+        if not body:
             return jsonify({'error': 'File data is required in request body'}), 400
 
         # Get configuration from headers or use defaults
@@ -61,11 +239,10 @@ def route_clean_html():
             unwanted_attrs = [attr.strip() for attr in unwanted_attrs if attr.strip()]
 
         # Check if content is HTML and clean it if necessary
-        content_to_write = request.data
-        if is_html_content(request.data):
+        if is_html_content(body):
             app.logger.info('Detected HTML content, cleaning it')
-            html_content = request.data.decode('utf-8', errors='ignore')
-            cleaned_html = clean_html(html_content, unwanted_tags, unwanted_attrs)
+            # The parser decodes the bytes itself, honoring the page's charset
+            cleaned_html = clean_html(body, unwanted_tags, unwanted_attrs)
 
             return jsonify({
                 'success': True,
@@ -74,6 +251,9 @@ def route_clean_html():
 
         return jsonify({'success': False, 'error': 'NotHTML'}), 400
 
+    except HTTPException:
+        # Body errors are answered with their own status by handle_body_error
+        raise
     except Exception as e:
         return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
 
@@ -82,7 +262,7 @@ def route_clean_html():
 def convert_by_url():
     try:
         # Get URL from JSON body
-        data = request.get_json()
+        data = read_json_body()
         if not data or 'url' not in data:
             return jsonify({'error': 'URL is required in JSON body'}), 400
         
@@ -92,11 +272,55 @@ def convert_by_url():
         unwanted_tags = data.get('unwanted_tags')
         unwanted_attrs = data.get('unwanted_attrs')
         detect_article = data.get('detect_article', True)
+        use_cache = request.headers.get('X-No-Cache') != '1'
         
         # Use shared conversion utility
-        result = convert_url_to_markdown(url, unwanted_tags, unwanted_attrs, detect_article)
+        result = convert_url_to_markdown(
+            url, unwanted_tags, unwanted_attrs, detect_article, use_cache=use_cache
+        )
         return jsonify(result)
     
+    except HTTPException:
+        # Body errors are answered with their own status by handle_body_error
+        raise
+    except Exception as e:
+        return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
+
+@app.route('/convert-by-urls', methods=['POST'])
+def convert_by_urls():
+    try:
+        # Get URLs from JSON body
+        data = read_json_body()
+        if not data or not isinstance(data.get('urls'), list):
+            return jsonify({'error': 'List of URLs is required in JSON body'}), 400
+        
+        urls = data['urls']
+        if len(urls) > MAX_BATCH_URLS:
+            return jsonify({'error': f'At most {MAX_BATCH_URLS} URLs are accepted per request'}), 400
+        
+        # Get configuration from JSON body or use defaults
+        unwanted_tags = data.get('unwanted_tags')
+        unwanted_attrs = data.get('unwanted_attrs')
+        detect_article = data.get('detect_article', True)
+        max_concurrency = data.get('max_concurrency')
+        # bool is an int subclass, but true/false are not thread counts
+        if max_concurrency is not None and (
+                not isinstance(max_concurrency, int)
+                or isinstance(max_concurrency, bool)
+                or max_concurrency < 1):
+            return jsonify({'error': 'max_concurrency must be a positive integer'}), 400
+        use_cache = request.headers.get('X-No-Cache') != '1'
+        
+        # Use shared conversion utility, converting URLs concurrently
+        results = convert_urls_to_markdown(
+            urls, unwanted_tags, unwanted_attrs, detect_article, max_concurrency,
+            use_cache
+        )
+        return jsonify({'results': results})
+    
+    except HTTPException:
+        # Body errors are answered with their own status by handle_body_error
+        raise
     except Exception as e:
         return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
 
@@ -104,7 +328,10 @@ def convert_by_url():
 def convert_by_body():
     try:
         # Check if file is present in request
-        if not request.data:
+        body = read_request_body()
+        if body is None:
+            return jsonify({'error': 'Unsupported Content-Encoding'}), 415
+        if not body:
             return jsonify({'error': 'File data is required in request body'}), 400
 
         # Get configuration from headers or use defaults
@@ -125,9 +352,12 @@ def convert_by_body():
         content_type = request.content_type or ''
         
         # Use shared conversion utility
-        result = convert_body_to_markdown(request.data, filename, content_type, unwanted_tags, unwanted_attrs, detect_article)
+        result = convert_body_to_markdown(body, filename, content_type, unwanted_tags, unwanted_attrs, detect_article)
         return jsonify(result)
     
+    except HTTPException:
+        # Body errors are answered with their own status by handle_body_error
+        raise
     except Exception as e:
         return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
 
@@ -136,16 +366,21 @@ def dereference_url_endpoint():
     """Dereference a URL by following redirects up to 20 times and return the final URL"""
     try:
         # Get URL from JSON body
-        data = request.get_json()
+        data = read_json_body()
         if not data or 'url' not in data:
             return jsonify({'error': 'URL is required in JSON body'}), 400
         
         url = data['url']
         
+        use_cache = request.headers.get('X-No-Cache') != '1'
+        
         # Use shared dereference utility
-        result = dereference_url(url)
+        result = dereference_url(url, use_cache=use_cache)
         return jsonify(result)
         
+    except HTTPException:
+        # Body errors are answered with their own status by handle_body_error
+        raise
     except Exception as e:
         return jsonify({'error': f'URL dereferencing failed: {str(e)}'}), 500
 
@@ -0,0 +1,4 @@
+"""
+Shared HTML cleaning, browser and conversion utilities.
+Used by both Flask server and Apify actors.
+"""
@@ -4,27 +4,183 @@ Browser utilities for handling bot detection and JavaScript rendering.
 Provides headless browser functionality for cases where regular HTTP requests fail.
 """
 
+import asyncio
 import time
 import re
 import os
+import atexit
+import functools
+import itertools
+import queue
+import ssl
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from selenium import webdriver
 
 # Load environment variables from .env file
 load_dotenv()
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Only the small exceptions module is imported eagerly; selenium's webdriver,
+# BeautifulSoup, selectolax, httpx and google.generativeai are imported where
+# they are used so callers that never render or ask Gemini don't load them
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from bs4 import BeautifulSoup
-import logging
-import google.generativeai as genai
+import base64
 import json
+import logging
+import requests
+from urllib.parse import urljoin
+
+# curl_cffi is optional; without it blocked pages go straight to the browser
+try:
+    from curl_cffi import requests as curl_requests
+    CURL_CFFI_AVAILABLE = True
+except ImportError:
+    CURL_CFFI_AVAILABLE = False
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache_utils import HTML_CACHE_DIR, PageCache, TTLCache, make_cache_key
+from .utils import HTML_PARSER
 
 logger = logging.getLogger(__name__)
 
+# Browser-like headers sent with every pooled request
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': (
+        'text/html,application/xhtml+xml,application/xml;q=0.9,'
+        'image/avif,image/webp,image/apng,*/*;q=0.8'
+    ),
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+def create_http_session():
+    """
+    Create a requests session with a connection pool sized for concurrent conversions.
+    
+    Returns:
+        requests.Session: Session with browser-like default headers
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Hand the last response back so callers can inspect the status
+            raise_on_status=False
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+# Shared session so TCP/TLS connections are reused across fetches
+http_session = create_http_session()
+
+@functools.lru_cache(maxsize=1)
+def get_http_client():
+    """
+    Return the shared HTTP/2 client used for plain page fetches.
+    
+    Created on first use so importing this module doesn't load httpx.
+    
+    Returns:
+        httpx.Client: Client with browser-like default headers
+    """
+    import httpx
+    
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+    client = httpx.Client(
+        transport=transport,
+        headers=DEFAULT_HEADERS,
+        timeout=30,
+        follow_redirects=True
+    )
+    atexit.register(client.close)
+    return client
+
+# Fetched pages, in memory and optionally on disk under HTML_CACHE_DIR
+page_cache = PageCache(directory=HTML_CACHE_DIR)
+
+# Medium.com and partner publications hosted on Medium
+MEDIUM_DOMAINS = (
+    'medium.com',
+    'levelup.gitconnected.com',
+    'towardsdatascience.com',
+    'betterprogramming.pub',
+    'javascript.plainenglish.io',
+    'python.plainenglish.io',
+    'blog.devgenius.io',
+    'codeburst.io',
+    'hackernoon.com',
+)
+MEDIUM_DOMAIN_PATTERN = re.compile(
+    '|'.join(re.escape(domain) for domain in MEDIUM_DOMAINS), re.IGNORECASE
+)
+
+# Searched case-insensitively in place instead of lowercasing the whole page
+LINK_WORD_PATTERN = re.compile('link', re.IGNORECASE)
+
+# Phrases on Medium pages that point at a free reading link, matched in one pass
+FREE_INDICATOR_PATTERN = re.compile(
+    '|'.join(re.escape(indicator) for indicator in (
+        'read this story for free', 'continue reading for free',
+        'free access', 'non-member', 'non members'
+    )),
+    re.IGNORECASE
+)
+
+# Signals that a Medium page is paywalled rather than fully readable
+PAYWALL_PATTERN = re.compile(
+    r'member-only|paywall|sign in to read|upgrade to read', re.IGNORECASE
+)
+
+# Cheap substring markers that must appear before a Medium page is analyzed
+FREE_READING_MARKERS = ('free', 'non-member', 'non member', 'friend_link', 'sk=')
+FREE_READING_MARKER_PATTERN = re.compile(
+    '|'.join(re.escape(marker) for marker in FREE_READING_MARKERS), re.IGNORECASE
+)
+FREE_MARKER_SCAN_LIMIT = 200000
+
+# Keywords in link text or URL that make a link worth sending to the AI
+LINK_CANDIDATE_KEYWORDS = ('free', 'member', 'sk=', 'friend')
+
+# Lowercased link texts of Medium free reading links, matched in one pass
+FREE_LINK_TEXTS = (
+    'read this story for free',
+    'continue reading for free',
+    'read for free',
+    'free access',
+    'non members',
+    'non-members',
+    'non-member link',
+    '(non-member link)',
+    'link'
+)
+FREE_LINK_TEXT_PATTERN = re.compile(
+    '|'.join(re.escape(text) for text in FREE_LINK_TEXTS)
+)
+
+# Upper bound on links examined by the Medium fallback scan
+FALLBACK_LINK_SCAN_LIMIT = 500
+
 # Configure Gemini AI
 def configure_gemini():
     """
@@ -35,9 +191,83 @@ def configure_gemini():
         logger.warning("GEMINI_API_KEY not found in environment variables")
         return False
     
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     return True
 
+# Caps concurrent Gemini requests to stay under the API rate limits
+_gemini_semaphore = threading.Semaphore(int(os.getenv('GEMINI_MAX_INFLIGHT', '4')))
+
+# Recent Gemini answers keyed by a fingerprint of the prompt
+_gemini_cache = TTLCache()
+
+# Shared Gemini model, built once by the first caller
+_gemini_model = None
+_gemini_model_ready = False
+_gemini_model_lock = threading.Lock()
+
+def _get_gemini_model():
+    """
+    Configure Gemini once and return the shared model, or None without an API key.
+    """
+    global _gemini_model, _gemini_model_ready
+    if _gemini_model_ready:
+        return _gemini_model
+    
+    with _gemini_model_lock:
+        if not _gemini_model_ready:
+            if configure_gemini():
+                import google.generativeai as genai
+                _gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            _gemini_model_ready = True
+    return _gemini_model
+
+def _extract_link_candidates(html_content, limit=200):
+    """
+    Collect links that may lead to a free reading version of the page.
+    
+    Args:
+        html_content (str): HTML content to scan
+        limit (int): Maximum number of links returned
+    
+    Returns:
+        list: Unique {"text": ..., "href": ...} dicts, text cut to 80 characters
+    """
+    candidates = []
+    seen = set()
+    for text, href in _extract_links(html_content):
+        text = ' '.join(text.split())[:80]
+        haystack = f"{text} {href}".lower()
+        if not any(keyword in haystack for keyword in LINK_CANDIDATE_KEYWORDS):
+            continue
+        
+        if (text, href) in seen:
+            continue
+        seen.add((text, href))
+        candidates.append({'text': text, 'href': href})
+        if len(candidates) >= limit:
+            break
+    
+    return candidates
+
+def _normalize_link(base_url, candidate):
+    """
+    Resolve a link against the page it was found on.
+    
+    Args:
+        base_url (str): URL of the page containing the link
+        candidate (str): Absolute, protocol-relative or relative link
+    
+    Returns:
+        str or None: Absolute http(s) URL, or None for other schemes and
+        strings that are not links
+    """
+    candidate = candidate.strip()
+    if not candidate or any(char.isspace() for char in candidate):
+        return None
+    full_url = urljoin(base_url, candidate)
+    return full_url if full_url.startswith(('http://', 'https://')) else None
+
 def find_free_reading_url_with_ai(url, html_content):
     """
     Use Gemini 1.5-flash to intelligently find free reading URLs in the HTML content.
@@ -49,26 +279,38 @@ def find_free_reading_url_with_ai(url, html_content):
     Returns:
         str or None: Free reading URL if found, None otherwise
     """
-    logger.debug(f"Starting AI analysis for URL: {url}")
-    logger.debug(f"HTML content length: {len(html_content)} characters")
+    logger.debug("Starting AI analysis for URL: %s", url)
+    logger.debug("HTML content length: %s characters", len(html_content))
     
-    if not configure_gemini():
+    model = _get_gemini_model()
+    if model is None:
         logger.warning("Gemini not configured, falling back to regex patterns")
         return None
     
     try:
-        # Create the model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        logger.debug("Gemini model created successfully")
-        
-        # Log a sample of the HTML content for debugging
-        sample_html = html_content[:2000]
-        logger.debug(f"HTML sample for AI analysis: {sample_html[:500]}...")
+        # Diagnostics scan the whole page, so only run them when they are logged
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log a sample of the HTML content for debugging
+            logger.debug("HTML sample for AI analysis: %s...", html_content[:500])
+            
+            # Check if HTML contains any obvious free reading indicators
+            found_indicators = sorted({
+                match.group(0).lower()
+                for match in FREE_INDICATOR_PATTERN.finditer(html_content)
+            })
+            logger.debug("Found free reading indicators in HTML: %s", found_indicators)
         
-        # Check if HTML contains any obvious free reading indicators
-        free_indicators = ['read this story for free', 'continue reading for free', 'free access', 'non-member', 'non members']
-        found_indicators = [indicator for indicator in free_indicators if indicator.lower() in html_content.lower()]
-        logger.debug(f"Found free reading indicators in HTML: {found_indicators}")
+        # Send only candidate links when there are any, raw HTML otherwise
+        link_candidates = _extract_link_candidates(html_content)
+        if link_candidates:
+            logger.debug("Sending %s candidate links to AI", len(link_candidates))
+            content_label = "Candidate links to analyze (JSON list of anchors)"
+            content_to_analyze = json.dumps(
+                link_candidates, ensure_ascii=False, separators=(',', ':')
+            )
+        else:
+            content_label = "HTML content to analyze"
+            content_to_analyze = html_content[:12000]
         
         # Prepare the enhanced prompt
         prompt = f"""
@@ -91,16 +333,24 @@ def find_free_reading_url_with_ai(url, html_content):
         Return ONLY the complete URL if found, or "NONE" if no free reading link exists.
         Do not include any explanation, just the URL or "NONE".
         
-        HTML content to analyze:
-        {html_content[:12000]}
+        {content_label}:
+        {content_to_analyze}
         """
         
-        logger.debug("Sending request to Gemini AI...")
-        # Generate response
-        response = model.generate_content(prompt)
-        result = response.text.strip()
+        # Republished pages often produce the same prompt
+        prompt_key = make_cache_key('gemini', prompt)
+        result = _gemini_cache.get(prompt_key)
+        if result is None:
+            logger.debug("Sending request to Gemini AI...")
+            # Generate response
+            with _gemini_semaphore:
+                response = model.generate_content(prompt)
+            result = response.text.strip()
+            _gemini_cache.set(prompt_key, result)
+        else:
+            logger.debug("Reusing cached Gemini response")
         
-        logger.debug(f"Gemini AI response: '{result}'")
+        logger.debug("Gemini AI response: '%s'", result)
         
         if result == "NONE" or not result:
             logger.debug("AI returned NONE or empty result")
@@ -108,22 +358,168 @@ def find_free_reading_url_with_ai(url, html_content):
             
         # Validate and clean the URL
         original_result = result
-        if result.startswith('//'):
-            result = 'https:' + result
-        elif result.startswith('/'):
-            result = 'https://medium.com' + result
-        elif not result.startswith('http'):
-            logger.debug(f"AI result '{original_result}' is not a valid URL format")
+        result = _normalize_link(url, result)
+        if result is None:
+            logger.debug("AI result '%s' is not a valid URL format", original_result)
             return None
             
-        logger.info(f"AI found free reading URL: {result}")
+        logger.info("AI found free reading URL: %s", result)
         return result
         
     except Exception as e:
-        logger.error(f"Error using Gemini to find free reading URL: {e}")
-        logger.debug(f"Full exception details: {str(e)}")
+        logger.error("Error using Gemini to find free reading URL: %s", e)
+        logger.debug("Full exception details: %r", e)
         return None
 
+# Page readiness checks, evaluated in order: document loaded, then no
+# resource requests still in flight
+_PAGE_READY_SCRIPTS = (
+    # The DOM is usable once parsing finished; don't wait for the load event
+    # (fresh drivers start on data:, and pooled ones are reset to about:blank)
+    "return !['about:blank', 'data:,'].includes(location.href)"
+    " && document.readyState !== 'loading'",
+    "return performance.getEntriesByType('resource')"
+    ".filter(r => !r.responseEnd).length === 0",
+)
+
+
+# Main document responses read from Chrome's performance log, by browser
+# session and loader id. The log is shared by all tabs of a browser, so each
+# read keeps the responses of other tabs' navigations until they claim them
+_document_responses = {}
+_document_responses_lock = threading.Lock()
+
+# Buffered responses that nobody claimed within this many seconds are dropped
+DOCUMENT_RESPONSE_MAX_AGE = 120
+
+
+def _drain_performance_log(driver):
+    """
+    Move main document responses from Chrome's performance log into the buffer.
+    
+    Must be called with _document_responses_lock held, so that a response
+    read by one thread is buffered before another thread looks for it.
+    
+    Args:
+        driver (webdriver.Chrome): Driver, or tab of one, whose log is read
+    
+    Returns:
+        dict: Loader id to (request id, time buffered) for the browser
+    """
+    entries = driver.get_log('performance')
+    responses = _document_responses.setdefault(driver.session_id, {})
+    now = time.monotonic()
+    
+    for entry in entries:
+        message = json.loads(entry['message'])['message']
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message['params']
+        if params.get('type') == 'Document':
+            responses[params.get('loaderId')] = (params['requestId'], now)
+    
+    for loader_id, (_, buffered_at) in list(responses.items()):
+        if now - buffered_at > DOCUMENT_RESPONSE_MAX_AGE:
+            del responses[loader_id]
+    return responses
+
+
+def _forget_performance_log(driver):
+    """Drop the buffered responses of a browser that is being quit"""
+    # A single dict operation is atomic, so the lock isn't needed; callers
+    # may hold a pool lock that a concurrent drain takes after this one
+    _document_responses.pop(driver.session_id, None)
+
+
+def _navigate(driver, url):
+    """
+    Start loading url through the DevTools protocol without waiting for the load event.
+    
+    Args:
+        driver (webdriver.Chrome): Driver to navigate
+        url (str): URL to load
+    
+    Returns:
+        str or None: Loader id of the new document, None for same-document navigations
+    
+    Raises:
+        ConnectionError: If Chrome could not start the navigation
+    """
+    result = driver.execute_cdp_cmd("Page.navigate", {"url": url})
+    if result.get('errorText'):
+        raise ConnectionError(
+            f"Navigation to {url} failed: {result['errorText']}"
+        )
+    return result.get('loaderId')
+
+
+def _get_main_document_body(driver, loader_id):
+    """
+    Return the main document's response body as received from the network.
+    
+    The response is found in Chrome's performance log by its loader id and
+    read with Network.getResponseBody, so the HTML is available without
+    waiting for the full page load. Changes made by scripts after parsing
+    are not included. Responses of other tabs read along the way are kept
+    in a buffer for them.
+    
+    Args:
+        driver (webdriver.Chrome): Driver that navigated to the page
+        loader_id (str): Loader id returned by _navigate
+    
+    Returns:
+        str or None: Response body, or None if it could not be captured
+    """
+    if loader_id is None:
+        return None
+    
+    try:
+        with _document_responses_lock:
+            document = _drain_performance_log(driver).pop(loader_id, None)
+    except WebDriverException as e:
+        logger.debug("Performance log unavailable: %s", e)
+        return None
+    
+    if document is None:
+        return None
+    
+    request_id, _ = document
+    try:
+        response = driver.execute_cdp_cmd(
+            "Network.getResponseBody", {"requestId": request_id}
+        )
+    except WebDriverException as e:
+        logger.debug("Could not read main document body: %s", e)
+        return None
+    
+    if response.get('base64Encoded'):
+        return base64.b64decode(response['body']).decode('utf-8', errors='replace')
+    return response['body']
+
+
+def _wait_page_ready(driver, timeout, scripts=_PAGE_READY_SCRIPTS):
+    """
+    Poll the page until it finished loading, backing off from 100ms to 1s.
+    
+    Args:
+        driver (webdriver.Chrome): Driver that navigated to the page
+        timeout (int): Maximum time to wait in seconds
+        scripts (tuple): Readiness checks run in order until each returns true
+    
+    Raises:
+        TimeoutException: If the page is not ready within the timeout
+    """
+    deadline = time.monotonic() + timeout
+    interval = 0.1
+    for script in scripts:
+        while not driver.execute_script(script):
+            if time.monotonic() >= deadline:
+                raise TimeoutException(
+                    f"Page not ready after {timeout} seconds"
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, 1.0)
+
 def navigate_to_url_with_browser(url):
     """
     Use browser to navigate to and click/follow the specified URL.
@@ -134,56 +530,93 @@ def navigate_to_url_with_browser(url):
     Returns:
         str: HTML content from the navigated page
     """
-    driver = None
     try:
-        driver = create_headless_browser()
-        
-        # Navigate to the URL
-        logger.info(f"Navigating to URL with browser: {url}")
-        driver.get(url)
-        
-        # Wait for the page to load
-        time.sleep(3)
-        
-        # Wait for body to be present
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        # Additional wait for dynamic content
-        time.sleep(2)
-        
-        # Get the fully rendered HTML
-        html_content = driver.page_source
-        
-        return html_content
+        with browser_pool.acquire() as driver:
+            # Navigate to the URL
+            logger.info("Navigating to URL with browser: %s", url)
+            loader_id = _navigate(driver, url)
+            
+            # Once the DOM is parsed the main document has fully arrived, so
+            # its body can be taken without waiting on subresources
+            _wait_page_ready(driver, 30, _PAGE_READY_SCRIPTS[:1])
+            html_content = _get_main_document_body(driver, loader_id)
+            if html_content is not None:
+                return html_content
+            
+            # Wait for the page and its dynamic content to load
+            _wait_page_ready(driver, 30)
+            
+            # Get the fully rendered HTML
+            html_content = driver.page_source
+            
+            return html_content
         
     except Exception as e:
-        logger.error(f"Error navigating to URL {url}: {e}")
+        logger.error("Error navigating to URL %s: %s", url, e)
         raise
-    finally:
-        if driver:
-            driver.quit()
+
+# Chrome flags for headless fetching; extensions are never needed for HTML
+# extraction, so they are disabled to shorten page loads
+_CHROME_ARGS = (
+    '--headless',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--window-size=1920,1080',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-software-rasterizer',
+    '--disable-features=Translate,BackForwardCache',
+    # Realistic user agent
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+)
+
+_CHROME_EXPERIMENTAL_OPTIONS = (
+    ('excludeSwitches', ['enable-automation']),
+    ('useAutomationExtension', False),
+)
+
+
+# Subresources not needed for HTML extraction, blocked before they are requested
+# unless a fetch asks for a full render
+_BLOCKED_URL_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3',
+]
+
+# Analytics, ad and payment hosts that never affect the article DOM; blocked
+# even for full renders
+_BLOCKED_TRACKER_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*segment.io*', '*segment.com*',
+    '*stripe.com*', '*facebook.net*', '*ads.medium.com*',
+]
+
+
+def _build_chrome_options():
+    """Build a fresh Options object from the module-level Chrome flags"""
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    for arg in _CHROME_ARGS:
+        chrome_options.add_argument(arg)
+    for name, value in _CHROME_EXPERIMENTAL_OPTIONS:
+        chrome_options.add_experimental_option(name, value)
+    # Network events are read back to capture main document bodies
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
 
 def create_headless_browser():
     """
     Create a headless Chrome browser instance with anti-detection settings.
     """
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # Add realistic user agent
-    chrome_options.add_argument(
-        '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-        'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    )
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    
+    chrome_options = _build_chrome_options()
     
     try:
         # Use system-installed ChromeDriver
@@ -193,19 +626,370 @@ def create_headless_browser():
         else:
             # Fallback to default system PATH
             service = Service()
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # Execute script to remove webdriver property
-        driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        # Reuse one HTTP connection to chromedriver for all commands
+        driver = webdriver.Chrome(
+            service=service, options=chrome_options, keep_alive=True
         )
         
+        _configure_driver(driver)
         return driver
     except Exception as e:
-        logger.error(f"Failed to create headless browser: {e}")
+        logger.error("Failed to create headless browser: %s", e)
         raise
 
-def get_html_with_browser(url, wait_for_js=True, timeout=30):
+def _configure_driver(driver):
+    """
+    Apply per-driver settings after Chrome has started.
+    
+    Hides the webdriver property, enables the DevTools Page domain used for
+    navigation, and blocks trackers, images, stylesheets, fonts and media so
+    page loads only wait on HTML and first-party scripts.
+    """
+    # Execute script to remove webdriver property
+    driver.execute_script(
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    )
+    
+    driver.execute_cdp_cmd("Page.enable", {})
+    
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        _set_resource_blocking(driver, True)
+    except WebDriverException as e:
+        # Blocking is only an optimization; keep the driver usable without it
+        logger.warning("Could not block subresources in headless browser: %s", e)
+
+
+def _set_resource_blocking(driver, enabled):
+    """Turn blocking of images, stylesheets, fonts and media on or off"""
+    urls = _BLOCKED_TRACKER_PATTERNS
+    if enabled:
+        urls = urls + _BLOCKED_URL_PATTERNS
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+
+
+class BrowserPool:
+    """
+    Thread-safe pool of warm headless Chrome drivers.
+    
+    Drivers are started on demand up to max_size and reused across fetches
+    instead of launching a new Chrome for every page.
+    
+    Args:
+        max_size (int): Maximum number of drivers kept alive
+        acquire_timeout (int): Seconds to wait for a free driver
+    """
+
+    def __init__(self, max_size=4, acquire_timeout=120):
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._closed = False
+
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a driver from the pool for the duration of a with-block.
+        
+        Each borrow works in a fresh tab that is closed afterwards, and cookies
+        are cleared, so history, DOM state and cookies don't carry over to the
+        next fetch, while the browser's HTTP and script caches stay warm even
+        when the page load timed out. Drivers that raised a WebDriverException
+        other than a timeout, or that fail to reset, are quit and replaced by
+        a driver started in the background.
+        """
+        driver = self._get_driver()
+        broken = False
+        try:
+            driver.switch_to.new_window('tab')
+            # DevTools settings apply per tab
+            _configure_driver(driver)
+            yield driver
+        except TimeoutException:
+            # A slow page does not mean the driver is unhealthy
+            raise
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            if broken:
+                self.discard(driver, refill=True)
+            else:
+                self.release(driver)
+
+    def _get_driver(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._size < self.max_size
+            if can_create:
+                # Reserve the slot before the slow Chrome startup
+                self._size += 1
+
+        if not can_create:
+            try:
+                return self._idle.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                raise TimeoutError(
+                    "Timed out waiting for a free headless browser"
+                )
+
+        try:
+            return create_headless_browser()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+
+    def release(self, driver):
+        """Clear cookies, close the borrowed tab and return the driver to the pool"""
+        try:
+            # Clear cookies while the borrowed tab is still open; WebDriver's
+            # delete_all_cookies only reaches the current document's domain,
+            # so every site's cookies are cleared over CDP
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            base_handle = driver.window_handles[0]
+            if driver.current_window_handle != base_handle:
+                driver.close()
+                driver.switch_to.window(base_handle)
+            # The driver isn't shared, so everything left in its log belongs
+            # to the closed tab; drop it so the log doesn't grow unbounded
+            driver.get_log('performance')
+            _forget_performance_log(driver)
+        except Exception as e:
+            logger.warning("Discarding headless browser that failed to reset: %s", e)
+            self.discard(driver, refill=True)
+            return
+
+        self._idle.put(driver)
+
+    def discard(self, driver, refill=False):
+        """
+        Quit a driver and free its slot in the pool.
+        
+        Args:
+            driver (webdriver.Chrome): Driver to quit
+            refill (bool): Start a replacement in the background so the next
+                acquire gets a warm driver
+        """
+        with self._lock:
+            self._size -= 1
+        _forget_performance_log(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        if refill and not self._closed:
+            threading.Thread(target=self._refill, daemon=True).start()
+
+    def _refill(self):
+        with self._lock:
+            if self._size >= self.max_size:
+                return
+            self._size += 1
+
+        try:
+            driver = create_headless_browser()
+        except Exception as e:
+            logger.warning("Could not start replacement headless browser: %s", e)
+            with self._lock:
+                self._size -= 1
+            return
+
+        self._idle.put(driver)
+
+    def close(self):
+        """Quit all idle drivers"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+
+
+class _Tab:
+    """
+    Driver stand-in bound to one tab of a shared Chrome.
+    
+    Every command switches to the tab first while holding the pool lock, so
+    tabs can wait on the network concurrently while their WebDriver commands
+    are serialized.
+    """
+
+    def __init__(self, driver, handle, lock):
+        self._driver = driver
+        self.handle = handle
+        self._lock = lock
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        with self._lock:
+            self._driver.switch_to.window(self.handle)
+            return self._driver.execute_cdp_cmd(cmd, cmd_args)
+
+    def execute_script(self, script, *args):
+        with self._lock:
+            self._driver.switch_to.window(self.handle)
+            return self._driver.execute_script(script, *args)
+
+    def get_log(self, log_type):
+        # Logs belong to the whole browser, not to this tab
+        with self._lock:
+            return self._driver.get_log(log_type)
+
+    @property
+    def session_id(self):
+        # All tabs share the browser's WebDriver session
+        return self._driver.session_id
+
+    @property
+    def page_source(self):
+        with self._lock:
+            self._driver.switch_to.window(self.handle)
+            return self._driver.page_source
+
+
+class TabPool:
+    """
+    Pool of tabs in a single headless Chrome, a drop-in for BrowserPool.
+    
+    Pages load in parallel tabs of one Chrome process instead of one Chrome
+    per fetch, which saves memory and overlaps network waits. Tabs share
+    cookies, so unlike BrowserPool they are not cleared between fetches.
+    Enabled with BROWSER_TAB_MODE=true.
+    
+    Args:
+        max_size (int): Maximum number of tabs kept open
+        acquire_timeout (int): Seconds to wait for a free tab
+    """
+
+    def __init__(self, max_size=4, acquire_timeout=120):
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        # Guards the driver and tab count, and serializes WebDriver commands
+        self._lock = threading.RLock()
+        self._driver = None
+        self._size = 0
+
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a tab from the pool for the duration of a with-block.
+        
+        The tab is navigated to about:blank and returned afterwards; tabs that
+        raised a WebDriverException other than a timeout are closed.
+        """
+        tab = self._get_tab()
+        broken = False
+        try:
+            yield tab
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            if broken:
+                self.discard(tab)
+            else:
+                self.release(tab)
+
+    def _get_tab(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    return self._open_tab()
+                except Exception:
+                    self._size -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a free browser tab")
+
+    def _open_tab(self):
+        # Called with the lock held
+        if self._driver is None:
+            # A fresh driver already has one configured tab
+            self._driver = create_headless_browser()
+        else:
+            self._driver.switch_to.new_window('tab')
+            _configure_driver(self._driver)
+        return _Tab(self._driver, self._driver.current_window_handle, self._lock)
+
+    def release(self, tab):
+        """Blank a borrowed tab and return it to the pool"""
+        try:
+            tab.execute_cdp_cmd("Page.navigate", {"url": "about:blank"})
+            # Keep the log from growing unbounded; other tabs may still be
+            # navigating, so their responses are buffered rather than dropped
+            with _document_responses_lock:
+                _drain_performance_log(tab)
+        except Exception as e:
+            logger.warning("Closing browser tab that failed to reset: %s", e)
+            self.discard(tab)
+            return
+
+        self._idle.put(tab)
+
+    def discard(self, tab):
+        """Close a tab, quitting Chrome once its last tab is gone"""
+        with self._lock:
+            self._size -= 1
+            try:
+                if self._size == 0:
+                    _forget_performance_log(self._driver)
+                    self._driver.quit()
+                else:
+                    self._driver.switch_to.window(tab.handle)
+                    self._driver.close()
+            except Exception:
+                pass
+            if self._size == 0:
+                self._driver = None
+
+    def close(self):
+        """Quit the shared browser and forget all tabs"""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            if self._driver is not None:
+                _forget_performance_log(self._driver)
+                try:
+                    self._driver.quit()
+                except Exception:
+                    pass
+            self._driver = None
+            self._size = 0
+
+
+# Shared pool of headless browsers (or of tabs in one browser with
+# BROWSER_TAB_MODE=true), size configurable via BROWSER_POOL_SIZE
+BROWSER_TAB_MODE = os.getenv('BROWSER_TAB_MODE', 'false').lower() == 'true'
+_pool_class = TabPool if BROWSER_TAB_MODE else BrowserPool
+browser_pool = _pool_class(max_size=int(os.getenv('BROWSER_POOL_SIZE', '4')))
+atexit.register(browser_pool.close)
+
+def get_html_with_browser(url, wait_for_js=True, timeout=30, min_wait=0,
+                          render_full=False):
     """
     Get HTML content using headless browser, allowing JavaScript to render.
     
@@ -213,48 +997,51 @@ def get_html_with_browser(url, wait_for_js=True, timeout=30):
         url (str): URL to fetch
         wait_for_js (bool): Whether to wait for JavaScript to load
         timeout (int): Maximum time to wait in seconds
+        min_wait (float): Minimum seconds to let the page run after navigation,
+            for sites that keep rendering once the network is idle
+        render_full (bool): Also load images, stylesheets, fonts and media
     
     Returns:
         str: HTML content after JavaScript rendering
     """
-    driver = None
     try:
-        driver = create_headless_browser()
-        
-        # Navigate to the URL
-        driver.get(url)
-        
-        if wait_for_js:
-            # Wait for the page to load and JavaScript to execute
-            time.sleep(3)
-            
-            # Wait for body to be present
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+        with browser_pool.acquire() as driver:
+            if render_full:
+                _set_resource_blocking(driver, False)
+            try:
+                # Navigate to the URL
+                started = time.monotonic()
+                _navigate(driver, url)
+                
+                if wait_for_js:
+                    # Wait for the page to load and JavaScript to execute
+                    _wait_page_ready(driver, timeout)
+                else:
+                    # Still wait for the new document to replace about:blank
+                    _wait_page_ready(driver, timeout, _PAGE_READY_SCRIPTS[:1])
+                
+                remaining = min_wait - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+                
+                # Get the fully rendered HTML
+                html_content = driver.page_source
+                
+                return html_content
             
-            # Additional wait for dynamic content
-            time.sleep(2)
-        
-        # Get the fully rendered HTML
-        html_content = driver.page_source
+            except TimeoutException:
+                logger.warning("Timeout waiting for page to load: %s", url)
+                return driver.page_source
+            finally:
+                if render_full:
+                    _set_resource_blocking(driver, True)
         
-        return html_content
-        
-    except TimeoutException:
-        logger.warning(f"Timeout waiting for page to load: {url}")
-        if driver:
-            return driver.page_source
-        raise
     except WebDriverException as e:
-        logger.error(f"WebDriver error for {url}: {e}")
+        logger.error("WebDriver error for %s: %s", url, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error getting HTML for {url}: {e}")
+        logger.error("Unexpected error getting HTML for %s: %s", url, e)
         raise
-    finally:
-        if driver:
-            driver.quit()
 
 def handle_medium_com(url, html_content):
     """
@@ -267,30 +1054,26 @@ def handle_medium_com(url, html_content):
     Returns:
         tuple: (new_url, new_html_content) or (original_url, original_html) if no redirect needed
     """
-    logger.info(f"Starting Medium.com processing for URL: {url}")
+    logger.info("Starting Medium.com processing for URL: %s", url)
     
     # Check if this is a Medium.com URL or Medium partner site
-    medium_domains = [
-        'medium.com',
-        'levelup.gitconnected.com',
-        'towardsdatascience.com',
-        'betterprogramming.pub',
-        'javascript.plainenglish.io',
-        'python.plainenglish.io',
-        'blog.devgenius.io',
-        'codeburst.io',
-        'hackernoon.com'
-    ]
+    if not MEDIUM_DOMAIN_PATTERN.search(url):
+        logger.debug("URL %s is not a Medium.com or partner URL, skipping processing", url)
+        return url, html_content
     
-    is_medium_url = any(domain in url.lower() for domain in medium_domains)
+    logger.debug("Detected Medium/partner URL: %s", url)
     
-    if not is_medium_url:
-        logger.debug(f"URL {url} is not a Medium.com or partner URL, skipping processing")
+    # Articles that loaded without a paywall need no free reading link
+    if not PAYWALL_PATTERN.search(html_content, 0, FREE_MARKER_SCAN_LIMIT):
+        logger.debug("No paywall signals found for %s, skipping processing", url)
         return url, html_content
     
-    logger.debug(f"Detected Medium/partner URL: {url}")
+    # Skip AI and link analysis for pages without any free reading marker
+    if not FREE_READING_MARKER_PATTERN.search(html_content, 0, FREE_MARKER_SCAN_LIMIT):
+        logger.debug("No free reading markers found for %s, skipping processing", url)
+        return url, html_content
     
-    logger.debug(f"Processing Medium.com URL with HTML content length: {len(html_content)}")
+    logger.debug("Processing Medium.com URL with HTML content length: %s", len(html_content))
     
     # Use AI to find free reading URL
     logger.info("Attempting AI-powered free reading URL detection...")
@@ -299,12 +1082,12 @@ def handle_medium_com(url, html_content):
     if free_url:
         try:
             # Use browser to navigate to the free reading link
-            logger.info(f"AI found free reading URL, navigating with browser: {free_url}")
+            logger.info("AI found free reading URL, navigating with browser: %s", free_url)
             free_html = navigate_to_url_with_browser(free_url)
-            logger.info(f"Successfully retrieved content from AI-found URL: {free_url}")
+            logger.info("Successfully retrieved content from AI-found URL: %s", free_url)
             return free_url, free_html
         except Exception as e:
-            logger.warning(f"Failed to navigate to AI-found free reading link {free_url}: {e}")
+            logger.warning("Failed to navigate to AI-found free reading link %s: %s", free_url, e)
             # Fall back to regex patterns if AI approach fails
             logger.info("Falling back to regex pattern matching...")
             return _handle_medium_com_fallback(url, html_content)
@@ -313,10 +1096,45 @@ def handle_medium_com(url, html_content):
         logger.info("AI didn't find free reading URL, trying fallback patterns")
         return _handle_medium_com_fallback(url, html_content)
 
+def _extract_links(html_content):
+    """
+    Return (text, href) pairs for all links in the page.
+    
+    Uses selectolax's C parser, falling back to BeautifulSoup when selectolax
+    is not installed or cannot parse the page.
+    
+    Args:
+        html_content (str): HTML content to scan
+    
+    Returns:
+        list: (link_text, href) tuples in document order
+    """
+    try:
+        from selectolax.parser import HTMLParser
+        
+        tree = HTMLParser(html_content)
+        return [
+            (node.text(), node.attributes.get('href'))
+            for node in tree.css('a[href]')
+        ]
+    except Exception as e:
+        logger.debug("selectolax unavailable, parsing links with BeautifulSoup: %s", e)
+    
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    soup = BeautifulSoup(
+        html_content, HTML_PARSER, parse_only=SoupStrainer('a', href=True)
+    )
+    return [(link.get_text(), link['href']) for link in soup.find_all('a', href=True)]
+
 def _handle_medium_com_fallback(url, html_content):
     """
     Fallback method using regex patterns for Medium.com free reading links.
     
+    Links are scanned once, up to FALLBACK_LINK_SCAN_LIMIT of them. Links
+    whose text matches are followed as soon as they are found; links that only
+    match by URL pattern are collected and tried afterwards.
+    
     Args:
         url (str): Original Medium URL
         html_content (str): HTML content from the page
@@ -324,152 +1142,208 @@ def _handle_medium_com_fallback(url, html_content):
     Returns:
         tuple: (new_url, new_html_content) or (original_url, original_html) if no redirect needed
     """
-    logger.debug(f"Starting fallback analysis for URL: {url}")
-    logger.debug(f"HTML content length: {len(html_content)} characters")
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Look for links with specific text content
-    links = soup.find_all('a', href=True)
-    logger.debug(f"Found {len(links)} links in HTML content")
-    
-    # Log all link texts for debugging
-    link_texts = []
-    for i, link in enumerate(links[:20]):  # Log first 20 links
-        link_text = link.get_text().lower().strip()
-        href = link.get('href')
-        link_texts.append(f"Link {i+1}: '{link_text}' -> {href}")
-    
-    logger.debug(f"Sample link texts: {link_texts}")
-    
-    # Define search patterns
-    search_patterns = [
-        'read this story for free',
-        'continue reading for free', 
-        'read for free',
-        'free access',
-        'non members',
-        'non-members',
-        'non-member link',
-        '(non-member link)',
-        'link'
-    ]
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug("Starting fallback analysis for URL: %s", url)
+    logger.debug("HTML content length: %s characters", len(html_content))
     
-    logger.debug(f"Searching for patterns: {search_patterns}")
+    links = _extract_links(html_content)
+    logger.debug("Found %s links in HTML content", len(links))
+    logger.debug("Searching for patterns: %s", FREE_LINK_TEXTS)
     
-    for i, link in enumerate(links):
-        link_text = link.get_text().lower().strip()
-        href = link.get('href')
-        
-        logger.debug(f"Analyzing link {i+1}: text='{link_text}', href='{href}'")
+    url_pattern_links = []
+    for i, (link_text, href) in enumerate(
+        itertools.islice(links, FALLBACK_LINK_SCAN_LIMIT)
+    ):
+        link_text = link_text.lower().strip()
+        if debug:
+            logger.debug("Analyzing link %s: text='%s', href='%s'", i+1, link_text, href)
         
         # Check for specific Medium non-member link patterns
-        matching_patterns = [phrase for phrase in search_patterns if phrase in link_text]
+        matching_pattern = FREE_LINK_TEXT_PATTERN.search(link_text)
+        
+        if not matching_pattern:
+            if href and ('source=' in href or 'sk=' in href or 'friend_link' in href):
+                url_pattern_links.append(href)
+            continue
+        
+        if debug:
+            logger.debug("Link %s matches pattern: %s", i+1, matching_pattern.group(0))
+        
+        # Clean up the URL
+        original_href = href
+        href = _normalize_link(url, href)
+        if href is None:
+            if debug:
+                logger.debug("Skipping link %s - invalid URL format: %s", i+1, original_href)
+            continue
+            
+        logger.info("Found Medium free reading link by fallback method: %s", href)
+        
+        try:
+            # Get the content from the free reading link
+            free_html = navigate_to_url_with_browser(href)
+            return href, free_html
+        except Exception as e:
+            logger.warning("Failed to fetch free reading link %s: %s", href, e)
+            continue
+    
+    # Check if HTML contains the word "link" anywhere (broader search)
+    if url_pattern_links and LINK_WORD_PATTERN.search(html_content):
+        logger.debug("HTML contains the word 'link' - checking for any potential free reading indicators")
         
-        if matching_patterns:
-            logger.debug(f"Link {i+1} matches patterns: {matching_patterns}")
+        # Try links that might be free reading links based on URL patterns
+        for href in url_pattern_links:
+            logger.debug("Found potential free reading link by URL pattern: %s", href)
             
             # Clean up the URL
-            original_href = href
-            if href.startswith('//'):
-                href = 'https:' + href
-            elif href.startswith('/'):
-                href = 'https://medium.com' + href
-            elif not href.startswith('http'):
-                logger.debug(f"Skipping link {i+1} - invalid URL format: {original_href}")
+            href = _normalize_link(url, href)
+            if href is None:
                 continue
                 
-            logger.info(f"Found Medium free reading link by fallback method: {href}")
+            logger.info("Found Medium free reading link by URL pattern: %s", href)
             
             try:
                 # Get the content from the free reading link
                 free_html = navigate_to_url_with_browser(href)
                 return href, free_html
             except Exception as e:
-                logger.warning(f"Failed to fetch free reading link {href}: {e}")
+                logger.warning("Failed to fetch free reading link %s: %s", href, e)
                 continue
-        else:
-            logger.debug(f"Link {i+1} does not match any patterns")
-    
-    # Check if HTML contains the word "link" anywhere (broader search)
-    if 'link' in html_content.lower():
-        logger.debug("HTML contains the word 'link' - checking for any potential free reading indicators")
-        
-        # Look for any link that might be a free reading link based on URL patterns
-        for i, link in enumerate(links):
-            href = link.get('href')
-            if href and ('source=' in href or 'sk=' in href or 'friend_link' in href):
-                logger.debug(f"Found potential free reading link by URL pattern: {href}")
-                
-                # Clean up the URL
-                if href.startswith('//'):
-                    href = 'https:' + href
-                elif href.startswith('/'):
-                    href = 'https://medium.com' + href
-                elif href.startswith('http'):
-                    pass  # Already valid
-                else:
-                    continue
-                    
-                logger.info(f"Found Medium free reading link by URL pattern: {href}")
-                
-                try:
-                    # Get the content from the free reading link
-                    free_html = navigate_to_url_with_browser(href)
-                    return href, free_html
-                except Exception as e:
-                    logger.warning(f"Failed to fetch free reading link {href}: {e}")
-                    continue
     
     # No free reading link found, return original content
     logger.debug("No free reading links found in fallback analysis")
     return url, html_content
 
-def fetch_with_browser_fallback(url, session=None, timeout=30):
+def _fetch_with_impersonation(url, timeout):
     """
-    Attempt to fetch URL with regular requests first, fall back to headless browser on 403.
+    Retry a blocked URL with curl_cffi impersonating Chrome's TLS and HTTP/2 fingerprint.
     
     Args:
         url (str): URL to fetch
-        session (requests.Session): Optional session to use for regular request
         timeout (int): Timeout in seconds
     
+    Returns:
+        Response with a successful status, or None if curl_cffi is not
+        installed or the request was still refused
+    """
+    if not CURL_CFFI_AVAILABLE:
+        return None
+    
+    try:
+        response = curl_requests.get(
+            url, impersonate='chrome120', timeout=timeout
+        )
+    except Exception as e:
+        logger.info("Impersonated request failed for %s: %s", url, e)
+        return None
+    
+    if response.status_code >= 400:
+        logger.info(
+            "Impersonated request for %s returned %s", url, response.status_code
+        )
+        return None
+    return response
+
+def _is_tls_error(error):
+    """Return whether a request exception was caused by a failed TLS handshake"""
+    while error is not None:
+        if isinstance(error, (ssl.SSLError, requests.exceptions.SSLError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def fetch_blocked_url(url, timeout=30, impersonate=True):
+    """
+    Fetch a URL that refused a plain HTTP request.
+    
+    A Chrome-impersonating HTTP request is tried first since it avoids a
+    multi-second render; the headless browser is the last resort.
+    
+    Args:
+        url (str): URL to fetch
+        timeout (int): Timeout in seconds
+        impersonate (bool): Whether to try the impersonating request; it only
+            helps when the server refused the client itself (a 403 or a
+            failed TLS handshake), not after DNS failures or timeouts
+    
     Returns:
         tuple: (html_content, final_url, used_browser, content_type)
     """
-    import requests
+    response = _fetch_with_impersonation(url, timeout) if impersonate else None
+    if response is not None:
+        content_type = response.headers.get('content-type', '').lower()
+        # Handle Medium.com specific cases
+        final_url, html_content = handle_medium_com(url, response.text)
+        return html_content, final_url, final_url != url, content_type
+    
+    html_content = get_html_with_browser(url, timeout=timeout)
+    # Handle Medium.com specific cases
+    final_url, html_content = handle_medium_com(url, html_content)
+    return html_content, final_url, True, None
+
+def fetch_with_browser_fallback(url, session=None, timeout=30, use_cache=True):
+    """
+    Attempt to fetch URL with regular requests first, fall back to
+    fetch_blocked_url (impersonation, then headless browser) on 403.
+    
+    Results are cached per URL. Fresh entries are returned without a request;
+    stale entries with an ETag or Last-Modified header are revalidated with a
+    conditional request and reused on 304 Not Modified.
+    
+    Args:
+        url (str): URL to fetch
+        session (httpx.Client or requests.Session): Optional session, defaults
+            to the shared HTTP/2 client
+        timeout (int): Timeout in seconds
+        use_cache (bool): Whether a cached page may be returned; the fetched
+            page is cached either way
+    
+    Returns:
+        tuple: (html_content, final_url, used_browser, content_type)
+    """
+    cached = page_cache.get(url) if use_cache else None
+    if cached is not None and page_cache.is_fresh(cached):
+        logger.debug("Serving %s from page cache", url)
+        return cached.result
+    
+    result, validators = _fetch_page(
+        url, session or get_http_client(), timeout, cached
+    )
+    page_cache.set(url, result, validators)
+    return result
+
+def _fetch_page(url, session, timeout, cached=None):
+    """
+    Fetch a page for fetch_with_browser_fallback, bypassing the page cache.
+    
+    Args:
+        url (str): URL to fetch
+        session (httpx.Client or requests.Session): Client for the plain HTTP request
+        timeout (int): Timeout in seconds
+        cached (CachedPage): Stale cache entry to revalidate, if any
+    
+    Returns:
+        tuple: (result, validators) where result is the fetch result tuple
+        and validators holds the response's ETag / Last-Modified headers
+    """
+    import httpx
+    
+    headers = cached.conditional_headers() if cached is not None else None
     
     # First try with regular requests
     try:
-        if session:
-            response = session.get(url, timeout=timeout)
-        else:
-            headers = {
-                'User-Agent': (
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                    'AppleWebKit/537.36 (KHTML, like Gecko) '
-                    'Chrome/120.0.0.0 Safari/537.36'
-                ),
-                'Accept': (
-                    'text/html,application/xhtml+xml,application/xml;q=0.9,'
-                    'image/avif,image/webp,image/apng,*/*;q=0.8'
-                ),
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            response = requests.get(url, headers=headers, timeout=timeout)
+        response = session.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            logger.debug("%s not modified, reusing cached page", url)
+            return cached.result, cached.validators
+        
         # If we get a 403, use headless browser
         if response.status_code == 403:
             logger.info(
-                f"Got 403 for {url}, falling back to headless browser"
+                "Got 403 for %s, falling back to impersonation and headless browser",
+                url
             )
-            html_content = get_html_with_browser(url, timeout=timeout)
-            # Handle Medium.com specific cases
-            final_url, html_content = handle_medium_com(url, html_content)
-            return html_content, final_url, True, None
+            return fetch_blocked_url(url, timeout), None
         
         response.raise_for_status()
         html_content = response.text
@@ -478,31 +1352,121 @@ def fetch_with_browser_fallback(url, session=None, timeout=30):
         final_url, html_content = handle_medium_com(url, html_content)
         # If Medium handling changed the content, we used browser
         used_browser = final_url != url
-        return html_content, final_url, used_browser, content_type
-    except requests.exceptions.HTTPError as e:
+        
+        # Validators only describe the page when Medium handling kept it
+        validators = {}
+        if not used_browser:
+            for header in ('etag', 'last-modified'):
+                if header in response.headers:
+                    validators[header] = response.headers[header]
+        return (html_content, final_url, used_browser, content_type), validators
+    except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
         if '403' in str(e):
             logger.info(
-                f"Got 403 error for {url}, falling back to headless browser"
+                "Got 403 error for %s, falling back to impersonation and headless browser",
+                url
             )
-            html_content = get_html_with_browser(url, timeout=timeout)
-            # Handle Medium.com specific cases
-            final_url, html_content = handle_medium_com(url, html_content)
-            return html_content, final_url, True, None
+            return fetch_blocked_url(url, timeout), None
         else:
             raise
-    except requests.exceptions.RequestException as e:
-        # For other request errors, try browser as last resort
+    except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+        # For other request errors, try browser as last resort; impersonation
+        # can only get past a refused TLS handshake, not an unreachable host
         logger.info(
-            f"Request failed for {url}, trying headless browser: {e}"
+            "Request failed for %s, trying headless browser: %s", url, e
         )
         try:
-            html_content = get_html_with_browser(url, timeout=timeout)
-            # Handle Medium.com specific cases
-            final_url, html_content = handle_medium_com(url, html_content)
-            return html_content, final_url, True, None
+            return fetch_blocked_url(url, timeout, _is_tls_error(e)), None
         except Exception as browser_error:
             logger.error(
-                f"Both regular request and browser failed for {url}: "
-                f"{browser_error}"
+                "Both regular request and browser failed for %s: %s",
+                url,
+                browser_error
             )
             raise e  # Raise the original request error
+
+
+async def fetch_many(urls, timeout=30, max_concurrency=32):
+    """
+    Fetch many URLs concurrently, rendering only 403 responses in the browser.
+    
+    All URLs are probed over one pooled HTTP/2 client at once; URLs answering
+    with 403 are queued to as many browser workers as the browser pool holds,
+    so renders overlap with the remaining probes.
+    
+    Args:
+        urls (list): URLs to fetch
+        timeout (int): Timeout in seconds per request or page load
+        max_concurrency (int): Maximum plain HTTP requests in flight
+    
+    Returns:
+        list: (html_content, final_url, used_browser, content_type) tuples in
+        input order, or the exception raised for URLs that could not be fetched
+    """
+    import httpx
+    
+    results = [None] * len(urls)
+    blocked = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def browser_worker():
+        while True:
+            item = await blocked.get()
+            if item is None:
+                return
+            index, url, impersonate = item
+            try:
+                results[index] = await asyncio.to_thread(
+                    fetch_blocked_url, url, timeout, impersonate
+                )
+            except Exception as e:
+                logger.error("Headless browser failed for %s: %s", url, e)
+                results[index] = e
+
+    async def probe(client, index, url):
+        try:
+            async with semaphore:
+                response = await client.get(url)
+            if response.status_code == 403:
+                logger.info("Got 403 for %s, queueing for headless browser", url)
+                await blocked.put((index, url, True))
+                return
+            response.raise_for_status()
+            content_type = response.headers.get('content-type', '').lower()
+            final_url, html_content = await asyncio.to_thread(
+                handle_medium_com, url, response.text
+            )
+            results[index] = (
+                html_content, final_url, final_url != url, content_type
+            )
+        except httpx.HTTPStatusError as e:
+            results[index] = e
+        except httpx.HTTPError as e:
+            # Same as fetch_with_browser_fallback: try the browser as last resort
+            logger.info("Request failed for %s, queueing for headless browser: %s", url, e)
+            await blocked.put((index, url, _is_tls_error(e)))
+        except Exception as e:
+            results[index] = e
+
+    workers = [
+        asyncio.create_task(browser_worker())
+        for _ in range(max(1, browser_pool.max_size))
+    ]
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    try:
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=limits,
+            headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True
+        ) as client:
+            await asyncio.gather(
+                *(probe(client, index, url) for index, url in enumerate(urls))
+            )
+    finally:
+        for _ in workers:
+            blocked.put_nowait(None)
+        await asyncio.gather(*workers)
+
+    return results
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Shared caching utilities for fetched and converted content.
+Used by both Flask server and Apify actors.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# diskcache is optional; without it fetched pages are only cached in memory
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Defaults for caches created without explicit limits
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', '300'))
+
+# Fetched pages are kept past their freshness so they can be revalidated
+HTML_CACHE_STALE_SECONDS = float(os.getenv('HTML_CACHE_STALE_SECONDS', '86400'))
+HTML_CACHE_DIR = os.getenv('HTML_CACHE_DIR')
+
+# Converted markdown depends only on the content, so it can be kept longer
+MARKDOWN_CACHE_TTL_SECONDS = float(os.getenv('MARKDOWN_CACHE_TTL_SECONDS', '86400'))
+MARKDOWN_CACHE_DIR = os.getenv('MARKDOWN_CACHE_DIR')
+# Markdown longer than this (in characters) is not cached, so a few large
+# documents can't fill worker memory
+MARKDOWN_CACHE_MAX_CHARS = int(os.getenv('MARKDOWN_CACHE_MAX_CHARS', str(512 * 1024)))
+
+# Cleaned HTML is held as full strings, so its cache is smaller and skips
+# outputs larger than CLEAN_HTML_CACHE_MAX_CHARS
+CLEAN_HTML_CACHE_MAX_ENTRIES = int(os.getenv('CLEAN_HTML_CACHE_MAX_ENTRIES', '512'))
+CLEAN_HTML_CACHE_MAX_CHARS = int(os.getenv('CLEAN_HTML_CACHE_MAX_CHARS', str(128 * 1024)))
+
+
+def make_cache_key(*parts):
+    """Build a compact cache key by hashing the given key parts"""
+    return hashlib.blake2b(
+        repr(parts).encode('utf-8'), digest_size=16
+    ).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time to live.
+
+    Args:
+        maxsize (int): Maximum number of entries kept, 0 disables the cache
+        ttl (float): Seconds after which an entry expires
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = CACHE_MAX_ENTRIES if maxsize is None else maxsize
+        self.ttl = CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _LazyDiskCache:
+    """
+    diskcache.Cache that is opened on first use, once in each process.
+
+    SQLite connections must not be carried across fork(), so caches created
+    at import time in a preloading gunicorn master are only opened by the
+    workers.
+
+    Args:
+        directory (str): Directory of the cache
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._cache = diskcache.Cache(self.directory)
+                    self._pid = pid
+        return self._cache
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        return self._open().get(key, default)
+
+    def set(self, key, value, expire=None):
+        """Store value under key, expiring after expire seconds"""
+        self._open().set(key, value, expire=expire)
+
+
+class TieredCache:
+    """
+    TTLCache backed by an optional on-disk tier.
+
+    The disk tier is used when a directory is given and diskcache is
+    installed; it survives restarts and is shared by all worker processes.
+
+    Args:
+        directory (str): Directory of the on-disk tier, None to disable it
+        maxsize (int): Maximum number of entries kept in memory
+        ttl (float): Seconds after which an entry expires
+    """
+
+    def __init__(self, directory=None, maxsize=None, ttl=None):
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._disk = None
+        if directory and DISKCACHE_AVAILABLE:
+            self._disk = _LazyDiskCache(directory)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        value = self._memory.get(key)
+        if value is None and self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._memory.set(key, value)
+        return default if value is None else value
+
+    def set(self, key, value):
+        """Store value under key in both tiers"""
+        self._memory.set(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self._memory.ttl)
+
+
+class CachedPage:
+    """
+    A fetched page as stored in a PageCache.
+
+    Args:
+        result (tuple): (html_content, final_url, used_browser, content_type)
+        validators (dict): ETag / Last-Modified response headers, if any
+        fetched_at (float): Wall-clock time the page was fetched or revalidated
+    """
+
+    __slots__ = ('result', 'validators', 'fetched_at')
+
+    def __init__(self, result, validators, fetched_at):
+        self.result = result
+        self.validators = validators
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self):
+        """Return request headers that revalidate this page with the server"""
+        headers = {}
+        if 'etag' in self.validators:
+            headers['If-None-Match'] = self.validators['etag']
+        if 'last-modified' in self.validators:
+            headers['If-Modified-Since'] = self.validators['last-modified']
+        return headers
+
+
+class PageCache:
+    """
+    Two-tier cache of fetched pages keyed by URL.
+
+    Pages are kept zlib-compressed in memory and, when a directory is given
+    and diskcache is installed, on disk so they survive restarts. Entries are
+    fresh for fresh_ttl seconds and kept for stale_ttl seconds so that their
+    validators can still be used for conditional requests.
+
+    Args:
+        directory (str): Directory of the on-disk tier, None to disable it
+        fresh_ttl (float): Seconds a page is served without revalidation
+        stale_ttl (float): Seconds a page is kept for revalidation
+        maxsize (int): Maximum number of pages kept in memory
+    """
+
+    def __init__(self, directory=None, fresh_ttl=None, stale_ttl=None, maxsize=None):
+        self.fresh_ttl = CACHE_TTL_SECONDS if fresh_ttl is None else fresh_ttl
+        self.stale_ttl = HTML_CACHE_STALE_SECONDS if stale_ttl is None else stale_ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=self.stale_ttl)
+        self._disk = None
+        if directory and DISKCACHE_AVAILABLE:
+            self._disk = _LazyDiskCache(directory)
+
+    def get(self, url):
+        """Return the CachedPage for url, or None if it is not cached"""
+        key = make_cache_key('page', url)
+        packed = self._memory.get(key)
+        if packed is None and self._disk is not None:
+            packed = self._disk.get(key)
+            if packed is not None:
+                self._memory.set(key, packed)
+        if packed is None:
+            return None
+
+        compressed, final_url, used_browser, content_type, validators, fetched_at = packed
+        html_content = zlib.decompress(compressed).decode('utf-8')
+        return CachedPage(
+            (html_content, final_url, used_browser, content_type),
+            validators,
+            fetched_at
+        )
+
+    def set(self, url, result, validators=None, fetched_at=None):
+        """Store a fetch result for url"""
+        html_content, final_url, used_browser, content_type = result
+        # Level 1 is nearly free to compute and still shrinks HTML about 4x
+        packed = (
+            zlib.compress(html_content.encode('utf-8'), 1),
+            final_url,
+            used_browser,
+            content_type,
+            validators or {},
+            time.time() if fetched_at is None else fetched_at
+        )
+        key = make_cache_key('page', url)
+        self._memory.set(key, packed)
+        if self._disk is not None:
+            self._disk.set(key, packed, expire=self.stale_ttl)
+
+    def is_fresh(self, page):
+        """Return whether a cached page can be served without revalidation"""
+        return time.time() - page.fetched_at < self.fresh_ttl
@@ -4,62 +4,233 @@ Shared conversion utilities for URL dereferencing and content conversion.
 Used by both Flask server and Apify actors.
 """
 
+import atexit
+import hashlib
+import io
+import multiprocessing
 import requests
-import tempfile
 import os
 import re
-
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse, urljoin
-from markitdown import MarkItDown
-from utils import is_html_content, extract_article_content, clean_html
-from browser_utils import fetch_with_browser_fallback
+import shutil
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse, urlunparse, urljoin, unquote_plus
+from .utils import is_html_content, clean_html
+from .markdown_utils import convert_to_markdown
+from .browser_utils import browser_pool, fetch_with_browser_fallback, http_session
+from .cache_utils import (
+    MARKDOWN_CACHE_DIR, MARKDOWN_CACHE_MAX_CHARS, MARKDOWN_CACHE_TTL_SECONDS,
+    TieredCache, TTLCache, make_cache_key
+)
 import logging
 
+# hyperscan is optional; without it every JS redirect pattern is searched with re
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
-# Initialize MarkItDown
-md = MarkItDown()
+# Worker processes for MarkItDown conversions, 0 converts in the request thread
+CONVERSION_PROCESSES = int(os.getenv('CONVERSION_PROCESSES', '0'))
+CONVERSION_TIMEOUT_SECONDS = float(os.getenv('CONVERSION_TIMEOUT_SECONDS', '120'))
+
+_conversion_executor = None
+_conversion_executor_lock = threading.Lock()
+
+# Recent results keyed by normalized URL and options
+_dereference_cache = TTLCache()
+_conversion_cache = TTLCache()
+
+# Converted markdown keyed by file extension and content hash
+_markdown_cache = TieredCache(
+    directory=MARKDOWN_CACHE_DIR, ttl=MARKDOWN_CACHE_TTL_SECONDS
+)
+
+# Read size used when streaming binary downloads
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Default seconds a page fetch (including a browser render) or a binary
+# download may take
+PAGE_FETCH_TIMEOUT = 30
+BINARY_FETCH_TIMEOUT = 60
+
+# Browser-like headers sent while following redirects, to avoid bot detection
+DEREFERENCE_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': (
+        'text/html,application/xhtml+xml,application/xml;'
+        'q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,'
+        'application/signed-exchange;v=b3;q=0.7'
+    ),
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+}
+
+# JavaScript and meta refresh redirects, compiled once and tried in order of
+# preference
+JS_REDIRECT_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'window\.location\.href\s*=\s*["\']([^"\'\']+)["\']',
+        r'window\.location\s*=\s*["\']([^"\'\']+)["\']',
+        r'location\.href\s*=\s*["\']([^"\'\']+)["\']',
+        r'location\s*=\s*["\']([^"\'\']+)["\']',
+        r'document\.location\s*=\s*["\']([^"\'\']+)["\']',
+        r'window\.location\.replace\s*\(\s*["\']([^"\'\']+)["\']\s*\)',
+        r'<meta[^>]+http-equiv=["\']refresh["\'][^>]+url=([^"\'\'\s>]+)',
+        r'location\.replace\s*\(["\']([^"\'\']+)["\']\)',
+        r'window\.open\s*\(["\']([^"\'\']+)["\']',
+        r'href\s*=\s*["\']([^"\'\']+)["\'].*click'
+    )
+)
+
+
+def _build_js_redirect_database():
+    """
+    Compile JS_REDIRECT_PATTERNS into one hyperscan database.
 
+    Returns:
+        hyperscan.Database: Block mode database, or None if hyperscan is not
+            installed or cannot compile the patterns
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
 
-def dereference_url(url, max_redirects=20):
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[p.pattern.encode('ascii') for p in JS_REDIRECT_PATTERNS],
+            ids=list(range(len(JS_REDIRECT_PATTERNS))),
+            elements=len(JS_REDIRECT_PATTERNS),
+            flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        )
+        return database
+    except hyperscan.error as e:
+        logger.warning(f'Could not compile JS redirect patterns with hyperscan: {e}')
+        return None
+
+
+# Single-pass prefilter telling which JS redirect patterns occur in a page;
+# hyperscan scratch space must not be shared between threads
+_js_redirect_database = _build_js_redirect_database()
+_js_redirect_scratch = threading.local()
+
+# Lowercase literal each JS redirect pattern above requires, so patterns
+# whose literal is absent from the page can be skipped with a substring check
+JS_REDIRECT_LITERALS = (
+    'window.location.href', 'window.location', 'location.href', 'location',
+    'document.location', 'window.location.replace', 'http-equiv',
+    'location.replace', 'window.open', 'href'
+)
+
+# Matched targets that are obviously not redirects
+JS_REDIRECT_SKIP = ('javascript:', 'mailto:', '#', 'void(0)')
+
+# Marker of Cloudflare challenge pages, matched without lowercasing the page
+CHALLENGE_PATTERN = re.compile('challenge', re.IGNORECASE)
+
+# File extension handed to markitdown, by URL path suffix
+EXTENSION_BY_SUFFIX = {
+    '.html': '.html', '.htm': '.html',
+    '.pdf': '.pdf',
+    '.docx': '.docx', '.doc': '.docx',
+    '.pptx': '.pptx', '.ppt': '.pptx',
+    '.xlsx': '.xlsx', '.xls': '.xlsx',
+    '.csv': '.csv',
+    '.json': '.json',
+    '.xml': '.xml',
+    '.epub': '.epub',
+    '.zip': '.zip',
+    '.jpg': '.jpg', '.jpeg': '.jpg', '.png': '.jpg', '.gif': '.jpg',
+    '.bmp': '.jpg', '.tiff': '.jpg', '.webp': '.jpg',
+    '.mp3': '.mp3', '.wav': '.mp3', '.m4a': '.mp3', '.aac': '.mp3',
+    '.txt': '.txt'
+}
+
+# File extension handed to markitdown, by media type
+EXTENSION_BY_CONTENT_TYPE = {
+    'text/html': '.html',
+    'application/xhtml+xml': '.html',
+    'application/pdf': '.pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+    'application/msword': '.docx',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': '.pptx',
+    'application/vnd.ms-powerpoint': '.pptx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx',
+    'application/vnd.ms-excel': '.xlsx',
+    'text/csv': '.csv',
+    'application/json': '.json',
+    'application/xml': '.xml',
+    'text/xml': '.xml',
+    'application/epub+zip': '.epub',
+    'application/zip': '.zip',
+    'text/plain': '.txt'
+}
+
+# Media type families converted with a single representative extension
+EXTENSION_BY_CONTENT_TYPE_PREFIX = (('image/', '.jpg'), ('audio/', '.mp3'))
+
+# Extensions of documents that are downloaded as bytes rather than as a page
+BINARY_EXTENSIONS = frozenset((
+    '.pdf', '.docx', '.pptx', '.xlsx', '.epub', '.zip', '.jpg', '.mp3'
+))
+
+# Common tracking parameters to remove, lowercased for case-insensitive checks
+TRACKING_PARAMS = frozenset((
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'fbclid', 'gclid', 'msclkid', 'twclid', 'li_fat_id',
+    '_ga', '_gl', 'mc_cid', 'mc_eid', 'mkt_tok',
+    'ref', 'referrer', 'source', 'campaign',
+    'igshid', 'ncid', 'cmpid', 'wt.mc_id'
+))
+
+
+def dereference_url(url, max_redirects=20, use_cache=True):
     """
     Dereference a URL by following redirects and return the final URL.
     
     Args:
         url (str): URL to dereference
         max_redirects (int): Maximum number of redirects to follow
+        use_cache (bool): Whether a cached result may be returned
     
     Returns:
         dict: Dictionary containing dereferencing results
     """
+    cache_key = make_cache_key(
+        'dereference', _normalize_url(url), max_redirects
+    )
+    cached_result = _dereference_cache.get(cache_key) if use_cache else None
+    if cached_result is not None:
+        logger.info(f"Using cached dereference result for {url}")
+        return {**cached_result, 'original_url': url}
+
     redirect_count = 0
     current_url = url
 
     redirect_chain = [url]
 
-    # Configure session with headers to avoid bot detection
+    # Per-call session keeps cookies set along the redirect chain isolated,
+    # while the shared adapter reuses pooled TCP/TLS connections across calls
     session = requests.Session()
-    session.headers.update({
-        'User-Agent': (
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/120.0.0.0 Safari/537.36'
-        ),
-        'Accept': (
-            'text/html,application/xhtml+xml,application/xml;'
-            'q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,'
-            'application/signed-exchange;v=b3;q=0.7'
-        ),
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0'
-    })
+    session.mount('http://', http_session.get_adapter('http://'))
+    session.mount('https://', http_session.get_adapter('https://'))
+    session.headers.update(DEREFERENCE_HEADERS)
 
     while redirect_count < max_redirects:
 
@@ -79,13 +250,8 @@ def dereference_url(url, max_redirects=20):
             if response.status_code in [301, 302, 303, 307, 308]:
                 location = response.headers.get('Location')
                 if location:
-                    # Handle relative URLs
-                    if location.startswith('/'):
-                        current_url = urljoin(current_url, location)
-                    elif not location.startswith(('http://', 'https://')):
-                        current_url = urljoin(current_url, location)
-                    else:
-                        current_url = location
+                    # urljoin resolves relative locations and keeps absolute ones
+                    current_url = urljoin(current_url, location)
                     
                     redirect_chain.append(current_url)
                     redirect_count += 1
@@ -102,7 +268,7 @@ def dereference_url(url, max_redirects=20):
 
                     # Check if this is a Cloudflare challenge page
                     cf_header = response.headers.get('cf-mitigated', '')
-                    if 'cf-mitigated' in cf_header or 'challenge' in content.lower():
+                    if 'cf-mitigated' in cf_header or CHALLENGE_PATTERN.search(content):
                         logger.info(
                             "Detected Cloudflare challenge page - "
                             "cannot follow redirect automatically"
@@ -110,59 +276,22 @@ def dereference_url(url, max_redirects=20):
                         break
 
                     # Look for common JavaScript redirect patterns
-                    js_redirect_patterns = [
-                        r'window\.location\.href\s*=\s*["\']([^"\'\']+)["\']',
-                        r'window\.location\s*=\s*["\']([^"\'\']+)["\']',
-                        r'location\.href\s*=\s*["\']([^"\'\']+)["\']',
-                        r'location\s*=\s*["\']([^"\'\']+)["\']',
-                        r'document\.location\s*=\s*["\']([^"\'\']+)["\']',
-                        r'window\.location\.replace\s*\(\s*["\']([^"\'\']+)["\']\s*\)',
-                        r'<meta[^>]+http-equiv=["\']refresh["\'][^>]+url=([^"\'\'\s>]+)',
-                        r'location\.replace\s*\(["\']([^"\'\']+)["\']\)',
-                        r'window\.open\s*\(["\']([^"\'\']+)["\']',
-                        r'href\s*=\s*["\']([^"\'\']+)["\'].*click'
-                    ]
-
-                    for pattern in js_redirect_patterns:
-                        matches = re.findall(
-                            pattern, content, re.IGNORECASE
-                        )
-                        if matches:
-                            for js_url in matches:
-                                # Skip obviously non-redirect URLs
-                                skip_patterns = [
-                                    'javascript:', 'mailto:', '#', 'void(0)'
-                                ]
-                                if any(skip in js_url.lower()
-                                       for skip in skip_patterns):
-                                    continue
-
-                                # Handle relative URLs
-                                if js_url.startswith('/'):
-                                    current_url = urljoin(current_url, js_url)
-                                elif not js_url.startswith(
-                                    ('http://', 'https://')
-                                ):
-                                    current_url = urljoin(
-                                        current_url, js_url
-                                    )
-                                else:
-                                    current_url = js_url
-
-                                logger.info(
-                                    f"Found JavaScript redirect to: {current_url}"
-                                )
-                                redirect_chain.append(current_url)
-                                redirect_count += 1
-                                break
-                        if matches:
-                            break
-                    else:
+                    js_url = _find_js_redirect(content)
+                    if js_url is None:
                         # No JavaScript redirect found, we're done
                         logger.info(
                             "No JavaScript redirects found in HTML content"
                         )
                         break
+
+                    # Handle relative URLs
+                    current_url = urljoin(current_url, js_url)
+
+                    logger.info(
+                        f"Found JavaScript redirect to: {current_url}"
+                    )
+                    redirect_chain.append(current_url)
+                    redirect_count += 1
                 except Exception:
                     logger.warning("Error parsing JavaScript redirects")
                     break
@@ -178,14 +307,7 @@ def dereference_url(url, max_redirects=20):
                     location = response.headers.get('Location')
                     if location:
                         # Handle relative URLs
-                        if location.startswith('/'):
-                            current_url = urljoin(current_url, location)
-                        elif not location.startswith(
-                            ('http://', 'https://')
-                        ):
-                            current_url = urljoin(current_url, location)
-                        else:
-                            current_url = location
+                        current_url = urljoin(current_url, location)
 
                         redirect_chain.append(current_url)
                         redirect_count += 1
@@ -196,41 +318,9 @@ def dereference_url(url, max_redirects=20):
                 break
 
     # Clean up tracking parameters from final URL
-    parsed_url = urlparse(current_url)
-
-    # Common tracking parameters to remove
-    tracking_params = {
-        'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-        'fbclid', 'gclid', 'msclkid', 'twclid', 'li_fat_id',
-        '_ga', '_gl', 'mc_cid', 'mc_eid', 'mkt_tok',
-        'ref', 'referrer', 'source', 'campaign',
-        'igshid', 'ncid', 'cmpid', 'WT.mc_id'
-    }
-
-    if parsed_url.query:
-        query_params = parse_qs(parsed_url.query, keep_blank_values=True)
-
-        # Remove tracking parameters
-        cleaned_params = {
-            k: v for k, v in query_params.items()
-            if k.lower() not in tracking_params
-        }
+    current_url = _strip_tracking_params(current_url)
 
-        # Rebuild URL with cleaned parameters
-        new_query = (
-            urlencode(cleaned_params, doseq=True) if cleaned_params else ''
-        )
-
-        current_url = urlunparse((
-            parsed_url.scheme,
-            parsed_url.netloc,
-            parsed_url.path,
-            parsed_url.params,
-            new_query,
-            parsed_url.fragment
-        ))
-
-    return {
+    result = {
         'success': True,
         'original_url': url,
         'final_url': current_url,
@@ -238,10 +328,62 @@ def dereference_url(url, max_redirects=20):
         'redirect_chain': redirect_chain,
         'max_redirects_reached': redirect_count >= max_redirects
     }
+    _dereference_cache.set(cache_key, result)
+    return dict(result)
+
+
+def _find_js_redirect(content):
+    """
+    Find the target of a JavaScript or meta refresh redirect in HTML.
+
+    Patterns are tried in order of preference and matches are scanned lazily,
+    so the search stops at the first usable target. Only patterns that can
+    occur in the page are searched: hyperscan finds them in one pass when it
+    is installed, otherwise patterns whose required literal is missing from
+    the lowercased page are skipped.
+
+    Returns:
+        str: The (possibly relative) redirect target, or None if there is none
+    """
+    if _js_redirect_database is None:
+        # Lowercasing once and probing literals with fast substring searches
+        # costs far less than running each case-insensitive pattern
+        lowered = content.lower()
+        patterns = [
+            pattern for pattern, literal
+            in zip(JS_REDIRECT_PATTERNS, JS_REDIRECT_LITERALS)
+            if literal in lowered
+        ]
+    else:
+        # One DFA pass over the page rules out the patterns that cannot match,
+        # so re only runs for pages that contain a redirect candidate
+        scratch = getattr(_js_redirect_scratch, 'scratch', None)
+        if scratch is None:
+            scratch = _js_redirect_scratch.scratch = hyperscan.Scratch(
+                _js_redirect_database
+            )
+        matched_ids = set()
+        _js_redirect_database.scan(
+            content.encode('utf-8', 'surrogatepass'),
+            match_event_handler=lambda pattern_id, *args: matched_ids.add(pattern_id),
+            scratch=scratch
+        )
+        patterns = [
+            pattern for pattern_id, pattern in enumerate(JS_REDIRECT_PATTERNS)
+            if pattern_id in matched_ids
+        ]
+
+    for pattern in patterns:
+        for match in pattern.finditer(content):
+            js_url = match.group(1)
+            if not any(skip in js_url.lower() for skip in JS_REDIRECT_SKIP):
+                return js_url
+    return None
 
 
 def convert_url_to_markdown(url, unwanted_tags=None, unwanted_attrs=None,
-                           detect_article=True):
+                           detect_article=True, session=None, use_cache=True,
+                           timeout=None):
     """
     Convert content from URL to markdown.
     
@@ -250,56 +392,138 @@ def convert_url_to_markdown(url, unwanted_tags=None, unwanted_attrs=None,
         unwanted_tags (list): List of HTML tags to remove
         unwanted_attrs (list): List of HTML attributes to remove
         detect_article (bool): Whether to extract article content
+        session (requests.Session): Optional session, defaults to the shared
+            HTTP/2 client for pages and the pooled session for binary
+            documents
+        use_cache (bool): Whether cached pages and results may be returned;
+            fresh results are cached either way
+        timeout (float): Seconds each request or page load may take, None
+            for PAGE_FETCH_TIMEOUT for pages and BINARY_FETCH_TIMEOUT for
+            binary documents
     
     Returns:
         dict: Dictionary containing conversion results
     """
+    cache_key = make_cache_key(
+        'convert', _normalize_url(url), unwanted_tags, unwanted_attrs,
+        detect_article
+    )
+    cached_result = _conversion_cache.get(cache_key) if use_cache else None
+    if cached_result is not None:
+        logger.info(f"Using cached conversion result for {url}")
+        return dict(cached_result)
+
     try:
-        # Use browser fallback for handling 403 errors and JS rendering
-        html_content, final_url, used_browser, content_type = (
-            fetch_with_browser_fallback(url, timeout=30)
+        # Documents recognisable by their URL are downloaded as bytes right
+        # away, instead of first being fetched and decoded as a page
+        ext = EXTENSION_BY_SUFFIX.get(_url_suffix(url))
+        if ext in BINARY_EXTENSIONS:
+            logger.info(f'Detected {ext} file from URL, fetching binary content')
+            content_to_write, url = _fetch_binary_content(url, session, timeout)
+        else:
+            content_to_write, ext, url = _fetch_page_content(
+                url, unwanted_tags, unwanted_attrs, detect_article, session,
+                use_cache, timeout
+            )
+
+        # Convert to markdown
+        result = _convert_content_to_markdown(content_to_write, ext, url)
+        # Results are kept in every worker, so only bounded ones are cached
+        if len(result['markdown']) <= MARKDOWN_CACHE_MAX_CHARS:
+            _conversion_cache.set(cache_key, result)
+        return dict(result)
+
+    except Exception as e:
+        logger.error(f"Error converting URL {url}: {e}")
+        raise
+
+
+def _fetch_page_content(url, unwanted_tags, unwanted_attrs, detect_article,
+                        session, use_cache, timeout=None):
+    """
+    Fetch a URL as a page and prepare its content for conversion.
+
+    Returns:
+        tuple: (content_to_write, ext, final_url)
+    """
+    # Use browser fallback for handling 403 errors and JS rendering
+    html_content, final_url, used_browser, content_type = (
+        fetch_with_browser_fallback(
+            url, session=session, timeout=timeout or PAGE_FETCH_TIMEOUT,
+            use_cache=use_cache
         )
+    )
 
-        # Convert HTML string to bytes for further processing
-        file_content = html_content.encode('utf-8')
+    # Update URL to final URL in case of redirects
+    url = final_url
 
-        # Update URL to final URL in case of redirects
-        url = final_url
+    # Log if browser was used
+    if used_browser:
+        logger.info(f'Used headless browser for {url}')
 
-        # Log if browser was used
-        if used_browser:
-            logger.info(f'Used headless browser for {url}')
+    # Determine file extension from URL or content-type
+    ext = _determine_file_extension(url, content_type)
 
-        # Determine file extension from URL or content-type
-        ext = _determine_file_extension(url, content_type)
+    # Handle different file types; HTML stays a str end to end and is
+    # only encoded once, after cleaning
+    if ext in BINARY_EXTENSIONS:
+        logger.info(f'Detected {ext} file, fetching binary content')
+        content_to_write, url = _fetch_binary_content(url, session, timeout)
 
-        # Handle different file types
-        content_to_write = file_content
+    elif ext == '.html' or is_html_content(html_content):
+        logger.info('Processing HTML content from URL')
+        # Parse once, descending to the article if requested
+        cleaned_html = clean_html(
+            html_content, unwanted_tags, unwanted_attrs, detect_article
+        )
+        content_to_write = cleaned_html.encode('utf-8')
+        ext = '.html'
 
-        if ext == '.pdf':
-            logger.info('Detected PDF file, fetching binary content')
-            content_to_write = _fetch_pdf_content(url)
+    else:
+        content_to_write = html_content.encode('utf-8')
 
-        elif ext == '.html' or is_html_content(file_content):
-            logger.info('Processing HTML content from URL')
-            html_content_str = file_content.decode('utf-8', errors='ignore')
+    return content_to_write, ext, url
 
-            # Extract article content if detect_article flag is set
-            if detect_article:
-                html_content_str = extract_article_content(html_content_str)
 
-            cleaned_html = clean_html(
-                html_content_str, unwanted_tags, unwanted_attrs
-            )
-            content_to_write = cleaned_html.encode('utf-8')
-            ext = '.html'
+def convert_urls_to_markdown(urls, unwanted_tags=None, unwanted_attrs=None,
+                            detect_article=True, max_concurrency=None,
+                            use_cache=True):
+    """
+    Convert content from several URLs to markdown concurrently.
+    
+    Args:
+        urls (list): URLs to convert
+        unwanted_tags (list): List of HTML tags to remove
+        unwanted_attrs (list): List of HTML attributes to remove
+        detect_article (bool): Whether to extract article content
+        max_concurrency (int): Maximum conversions in flight, defaults to and
+            is capped at the browser pool size so 403 fallbacks don't wait on
+            each other
+        use_cache (bool): Whether cached pages and results may be returned
+    
+    Returns:
+        list: Conversion result dicts in input order; failed URLs yield
+        {'success': False, 'url': ..., 'error': ...}
+    """
+    if not urls:
+        return []
 
-        # Create temporary file and convert
-        return _convert_content_to_markdown(content_to_write, ext, url)
+    max_workers = min(
+        len(urls), max_concurrency or browser_pool.max_size,
+        browser_pool.max_size
+    )
 
-    except Exception as e:
-        logger.error(f"Error converting URL {url}: {e}")
-        raise
+    def convert(url):
+        try:
+            return convert_url_to_markdown(
+                url, unwanted_tags, unwanted_attrs, detect_article,
+                use_cache=use_cache
+            )
+        except Exception as e:
+            return {'success': False, 'url': url, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(convert, urls))
 
 
 def convert_body_to_markdown(
@@ -321,165 +545,264 @@ def convert_body_to_markdown(
         dict: Dictionary containing conversion results
     """
     try:
-        # Determine file extension
-        if filename:
-            ext = os.path.splitext(filename)[1] or '.bin'
-        else:
-            ext = _determine_file_extension_from_content_type(
-                content_type or ''
-            )
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        # Dispatch on the media type, ignoring parameters such as charset
+        media_type = (content_type or '').split(';', 1)[0].strip().lower()
+        handler = _BODY_HANDLERS.get(media_type, _convert_document_body)
+        return handler(
+            content, filename, media_type, unwanted_tags, unwanted_attrs,
+            detect_article
+        )
 
-        # Check if content is HTML and process it if necessary
-        content_to_write = content
-        if is_html_content(content):
-            logger.info('Detected HTML content, processing it')
-            html_content = content.decode('utf-8', errors='ignore')
+    except Exception as e:
+        logger.error(f"Error converting body content: {e}")
+        raise
 
-            # Extract article content if detect_article flag is set
-            if detect_article:
-                html_content = extract_article_content(html_content)
 
-            cleaned_html = clean_html(
-                html_content, unwanted_tags, unwanted_attrs
-            )
-            content_to_write = cleaned_html.encode('utf-8')
-            ext = '.html'
+def _convert_document_body(
+    content, filename, media_type, unwanted_tags, unwanted_attrs,
+    detect_article
+):
+    """Convert HTML or any document format supported by MarkItDown"""
+    # Determine file extension
+    if filename:
+        ext = os.path.splitext(filename)[1] or '.bin'
+    else:
+        ext = _determine_file_extension_from_content_type(media_type)
 
-        # Convert to markdown
-        return _convert_content_to_markdown(content_to_write, ext)
+    # Check if content is HTML and process it if necessary
+    content_to_write = content
+    if is_html_content(content):
+        logger.info('Detected HTML content, processing it')
+        html_content = content.decode('utf-8', errors='ignore')
 
-    except Exception as e:
-        logger.error(f"Error converting body content: {e}")
-        raise
+        # Parse once, descending to the article if requested
+        cleaned_html = clean_html(
+            html_content, unwanted_tags, unwanted_attrs, detect_article
+        )
+        content_to_write = cleaned_html.encode('utf-8')
+        ext = '.html'
+
+    # Convert to markdown
+    return _convert_content_to_markdown(content_to_write, ext)
+
+
+def _passthrough_markdown_body(
+    content, filename, media_type, unwanted_tags, unwanted_attrs,
+    detect_article
+):
+    """Return content that already is markdown without converting it"""
+    logger.info('Content is already markdown, skipping conversion')
+    return {
+        'success': True,
+        'markdown': content.decode('utf-8', errors='ignore')
+    }
+
+
+# Body handlers by media type, everything else goes through MarkItDown
+_BODY_HANDLERS = {
+    'text/markdown': _passthrough_markdown_body,
+    'text/x-markdown': _passthrough_markdown_body,
+}
+
+
+def _strip_tracking_params(url):
+    """Remove common tracking query parameters from a URL"""
+    # Most URLs have no query string at all, so skip parsing them
+    if '?' not in url:
+        return url
+
+    parsed_url = urlparse(url)
+    if not parsed_url.query:
+        return url
+
+    # Filter the raw name=value pairs, so untouched parameters keep their
+    # original order and encoding
+    pairs = parsed_url.query.split('&')
+    kept_pairs = [
+        pair for pair in pairs
+        if pair and unquote_plus(pair.split('=', 1)[0]).lower() not in TRACKING_PARAMS
+    ]
+    if len(kept_pairs) == len(pairs):
+        return url
+
+    # Rebuild URL with cleaned parameters
+    return urlunparse(parsed_url._replace(query='&'.join(kept_pairs)))
+
+
+def _normalize_url(url):
+    """Normalize a URL for use as a cache key"""
+    parsed_url = urlparse(_strip_tracking_params(url.strip()))
+    return urlunparse(parsed_url._replace(
+        scheme=parsed_url.scheme.lower(), netloc=parsed_url.netloc.lower()
+    ))
+
+
+def _url_suffix(url):
+    """Return the lowercased extension of a URL's path, ignoring any query string"""
+    return os.path.splitext(urlparse(url).path)[1].lower()
 
 
 def _determine_file_extension(url, content_type=None):
     """Determine file extension from URL or content-type"""
-    ext = '.html'  # Default to HTML
-    url_lower = url.lower()
-
-    # First check URL extension
-    if url_lower.endswith('.pdf'):
-        ext = '.pdf'
-    elif url_lower.endswith(('.docx', '.doc')):
-        ext = '.docx'
-    elif url_lower.endswith(('.pptx', '.ppt')):
-        ext = '.pptx'
-    elif url_lower.endswith(('.xlsx', '.xls')):
-        ext = '.xlsx'
-    elif url_lower.endswith('.csv'):
-        ext = '.csv'
-    elif url_lower.endswith('.json'):
-        ext = '.json'
-    elif url_lower.endswith('.xml'):
-        ext = '.xml'
-    elif url_lower.endswith('.epub'):
-        ext = '.epub'
-    elif url_lower.endswith('.zip'):
-        ext = '.zip'
-    elif url_lower.endswith((
-        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'
-    )):
-        ext = '.jpg'
-    elif url_lower.endswith(('.mp3', '.wav', '.m4a', '.aac')):
-        ext = '.mp3'
-    elif url_lower.endswith('.txt'):
-        ext = '.txt'
+    # First check the extension of the URL path
+    ext = EXTENSION_BY_SUFFIX.get(_url_suffix(url))
+    if ext:
+        return ext
+
     # If no extension found in URL, check content-type header
-    elif content_type:
-        ext = _determine_file_extension_from_content_type(content_type)
+    if content_type:
+        return _determine_file_extension_from_content_type(content_type)
 
-    return ext
+    # Default to HTML
+    return '.html'
 
 
 def _determine_file_extension_from_content_type(content_type):
     """Determine file extension from content-type header"""
-    content_type = content_type.lower()
+    media_type = content_type.split(';', 1)[0].strip().lower()
+
+    ext = EXTENSION_BY_CONTENT_TYPE.get(media_type)
+    if ext:
+        return ext
 
-    if 'pdf' in content_type or content_type == 'application/pdf':
+    for prefix, prefix_ext in EXTENSION_BY_CONTENT_TYPE_PREFIX:
+        if media_type.startswith(prefix):
+            return prefix_ext
+
+    if 'pdf' in media_type:
         return '.pdf'
-    elif content_type in [
-        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'application/msword'
-    ]:
-        return '.docx'
-    elif content_type in [
-        'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-        'application/vnd.ms-powerpoint'
-    ]:
-        return '.pptx'
-    elif content_type in [
-        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'application/vnd.ms-excel'
-    ]:
-        return '.xlsx'
-    elif content_type == 'text/csv':
-        return '.csv'
-    elif content_type == 'application/json':
-        return '.json'
-    elif content_type in ['application/xml', 'text/xml']:
-        return '.xml'
-    elif content_type == 'application/epub+zip':
-        return '.epub'
-    elif content_type == 'application/zip':
-        return '.zip'
-    elif content_type.startswith('image/'):
-        return '.jpg'
-    elif content_type.startswith('audio/'):
-        return '.mp3'
-    elif content_type == 'text/plain':
-        return '.txt'
-    elif 'html' in content_type:
+    if 'html' in media_type:
         return '.html'
-    else:
-        return '.bin'
+    return '.bin'
+
+
+def _fetch_binary_content(url, session=None, timeout=None):
+    """
+    Fetch a binary document (PDF, Office file, image, ...) from URL.
 
+    The body is streamed into a single buffer in DOWNLOAD_CHUNK_SIZE chunks
+    instead of being collected as a list of chunks and joined, so only one
+    copy of the document is resident while it downloads.
 
-def _fetch_pdf_content(url):
-    """Fetch PDF content from URL"""
+    Returns:
+        tuple: (content, final_url)
+    """
     try:
-        headers = {
-            'User-Agent': (
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/120.0.0.0 Safari/537.36'
-            ),
-            'Accept': 'application/pdf,*/*'
-        }
-        pdf_response = requests.get(url, headers=headers, timeout=60)
-        pdf_response.raise_for_status()
-        logger.info(
-            f'Successfully fetched PDF content: '
-            f'{len(pdf_response.content)} bytes'
-        )
-        return pdf_response.content
+        session = session or http_session
+        headers = {'Accept': 'application/pdf,*/*'}
+        with session.get(
+            url, headers=headers, timeout=timeout or BINARY_FETCH_TIMEOUT,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            buffer = io.BytesIO()
+            shutil.copyfileobj(response.raw, buffer, DOWNLOAD_CHUNK_SIZE)
+            final_url = response.url
+
+        # getvalue() hands over the buffer without copying it
+        content = buffer.getvalue()
+        logger.info(f'Successfully fetched binary content: {len(content)} bytes')
+        return content, final_url
     except Exception as e:
-        logger.error(f'Failed to fetch PDF content: {e}')
+        logger.error(f'Failed to fetch binary content: {e}')
         raise
 
 
-def _convert_content_to_markdown(content, ext, source_url=None):
-    """Convert content to markdown using temporary file"""
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-        temp_file.write(content)
-        temp_file_path = temp_file.name
+def _get_conversion_executor():
+    """
+    Return the process pool for MarkItDown conversions, creating it on first use.
+
+    Workers are spawned rather than forked, so they don't inherit the browser
+    pool's threads and locks, and only import the lightweight markdown_utils.
+
+    Returns:
+        ProcessPoolExecutor: The pool, or None if CONVERSION_PROCESSES is 0
+    """
+    global _conversion_executor
+
+    if CONVERSION_PROCESSES <= 0:
+        return None
+
+    with _conversion_executor_lock:
+        if _conversion_executor is None:
+            _conversion_executor = ProcessPoolExecutor(
+                max_workers=CONVERSION_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            atexit.register(_conversion_executor.shutdown, wait=False)
+        return _conversion_executor
+
+
+def _discard_conversion_executor(executor, kill_workers=False):
+    """
+    Stop using a conversion pool, so the next conversion starts a new one.
+
+    Args:
+        executor (ProcessPoolExecutor): Pool to discard
+        kill_workers (bool): Kill its worker processes, which may still be
+            busy with a conversion that will never be collected
+    """
+    global _conversion_executor
+
+    with _conversion_executor_lock:
+        if _conversion_executor is not executor:
+            # Another thread already replaced it
+            return
+        _conversion_executor = None
+
+    # shutdown() forgets the processes, so take them first
+    processes = list((executor._processes or {}).values()) if kill_workers else []
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.kill()
+
+
+def _run_conversion(content, ext):
+    """Convert content with MarkItDown, in a worker process when enabled"""
+    executor = _get_conversion_executor()
+    if executor is None:
+        return convert_to_markdown(content, ext)
 
     try:
-        # Convert to markdown
-        result = md.convert(temp_file_path)
-        markdown_content = result.text_content
+        future = executor.submit(convert_to_markdown, content, ext)
+        return future.result(timeout=CONVERSION_TIMEOUT_SECONDS)
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a new pool next time
+        _discard_conversion_executor(executor)
+        raise
+    except TimeoutError:
+        # A hung conversion would hold its worker for good, so replace the
+        # pool; conversions queued behind it fail and can be retried
+        future.cancel()
+        logger.warning(
+            f"Conversion took over {CONVERSION_TIMEOUT_SECONDS}s, restarting conversion workers"
+        )
+        _discard_conversion_executor(executor, kill_workers=True)
+        raise
 
-        response_data = {
-            'success': True,
-            'markdown': markdown_content
-        }
 
-        if source_url:
-            response_data['source_url'] = source_url
+def _convert_content_to_markdown(content, ext, source_url=None):
+    """Convert content to markdown, reusing the result for identical content"""
+    cache_key = make_cache_key(
+        'markdown', ext, hashlib.blake2b(content, digest_size=16).digest()
+    )
+    markdown_content = _markdown_cache.get(cache_key)
+
+    if markdown_content is None:
+        markdown_content = _run_conversion(content, ext)
+        if len(markdown_content) <= MARKDOWN_CACHE_MAX_CHARS:
+            _markdown_cache.set(cache_key, markdown_content)
+
+    response_data = {
+        'success': True,
+        'markdown': markdown_content
+    }
 
-        return response_data
+    if source_url:
+        response_data['source_url'] = source_url
 
-    finally:
-        # Clean up temporary file
-        os.unlink(temp_file_path)
\ No newline at end of file
+    return response_data
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Shared MarkItDown conversion helpers.
+Kept free of browser and network imports so conversion worker processes
+start quickly.
+"""
+
+import io
+
+from markitdown import MarkItDown
+
+# Initialize MarkItDown, once per process
+md = MarkItDown()
+
+
+def convert_to_markdown(content, ext):
+    """
+    Convert document content to markdown.
+
+    Args:
+        content (bytes): Document content
+        ext (str): File extension telling MarkItDown which converter to use
+
+    Returns:
+        str: The converted markdown
+    """
+    # Convert straight from memory
+    result = md.convert_stream(io.BytesIO(content), file_extension=ext)
+    return result.text_content
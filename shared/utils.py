@@ -4,91 +4,316 @@ Shared utility functions for HTML processing and content cleaning.
 Used by both Flask server and Apify actors.
 """
 
+import functools
+import hashlib
 import re
-from bs4 import BeautifulSoup
+import threading
+from bs4 import BeautifulSoup, UnicodeDammit
+
+from .cache_utils import (
+    CLEAN_HTML_CACHE_MAX_CHARS, CLEAN_HTML_CACHE_MAX_ENTRIES, TTLCache,
+    make_cache_key
+)
+
+# lxml is the fast C-backed parser; fall back to BeautifulSoup's pure-Python
+# one without it
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+    HTML_PARSER = 'lxml'
+except ImportError:
+    LXML_AVAILABLE = False
+    HTML_PARSER = 'html.parser'
+
+# Defaults used by clean_html when no tags or attributes are given
+DEFAULT_UNWANTED_TAGS = (
+    'head', 'img', 'script', 'style', 'meta', 'link',
+    'noscript', 'iframe', 'embed', 'object'
+)
+DEFAULT_UNWANTED_ATTRS = (
+    'style', 'class', 'id', 'onclick', 'onload', 'onerror',
+    'data-(.*)', 'width', 'height', 'valign', 'role',
+    'align', 'cellspacing', 'border', 'cellpadding', 'aria-(.*)'
+)
+
+# Tags kept by the empty tag pass even though they never hold text
+EMPTY_TAGS_TO_KEEP = frozenset(('br', 'hr', 'img'))
+
+# Recently cleaned HTML keyed by content hash and patterns
+_clean_html_cache = TTLCache(maxsize=CLEAN_HTML_CACHE_MAX_ENTRIES)
+
+# lxml parsers must not be shared between threads, so each thread gets its own
+_html_parsers = threading.local()
+
+# Leading XML declaration of XHTML documents; lxml rejects str input that
+# declares an encoding, and the HTML parser ignores the declaration anyway
+_XML_DECLARATION_RE = re.compile(r'\ufeff?\s*<\?xml[^>]*\?>')
+
+# Tags whose presence marks content as HTML, as str and bytes patterns so
+# raw request bodies can be checked without decoding them. All alternatives
+# share the leading '<', so the regex engine skips ahead to each '<' with a
+# fast literal search and only then tries the tag names, in a single pass
+_HTML_TAG_PATTERN = r'<(?:!doctype\s+html|\s*(?:html|body|div|span|p)[^>]*>)'
+_HTML_TAG_RE = re.compile(_HTML_TAG_PATTERN, re.IGNORECASE)
+_HTML_TAG_BYTES_RE = re.compile(_HTML_TAG_PATTERN.encode('ascii'), re.IGNORECASE)
+
+# Only the start of the content is sniffed, so multi-MB uploads such as PDFs
+# cost the same as small ones
+HTML_SNIFF_LENGTH = 4096
 
 
 def is_html_content(content):
-    """Check if content is HTML by looking for HTML tags"""
-    if isinstance(content, bytes):
-        content_str = content.decode('utf-8', errors='ignore')
-    else:
-        content_str = str(content)
-    return bool(re.search(
-        r'<\s*html[^>]*>|<\s*body[^>]*>|<\s*div[^>]*>|<\s*p[^>]*>',
-        content_str, re.IGNORECASE
-    ))
+    """Check if content (str or bytes) is HTML by looking for HTML tags near its start"""
+    if isinstance(content, (bytes, bytearray)):
+        return bool(_HTML_TAG_BYTES_RE.search(content, 0, HTML_SNIFF_LENGTH))
+    return bool(_HTML_TAG_RE.search(str(content), 0, HTML_SNIFF_LENGTH))
+
+
+def _parse_document(html_content):
+    """
+    Parse HTML (str or bytes) into an lxml tree.
+
+    Uses lxml.etree's HTML parser rather than lxml.html, whose custom element
+    classes add a Python-level lookup for every node that is created. The
+    parser skips building libxml2's hash table of id attributes, which is
+    never used and whose attributes clean_html removes by default.
+
+    Returns:
+        lxml.etree._Element: The <html> root, or None for empty content
+    """
+    if isinstance(html_content, bytes):
+        # lxml assumes latin-1 for bytes without a charset declaration, so
+        # let BeautifulSoup's detector pick the encoding as it did before
+        html_content = UnicodeDammit(html_content, is_html=True).unicode_markup
+    declaration = _XML_DECLARATION_RE.match(html_content)
+    if declaration:
+        html_content = html_content[declaration.end():]
+    parser = getattr(_html_parsers, 'parser', None)
+    if parser is None:
+        parser = _html_parsers.parser = etree.HTMLParser(collect_ids=False)
+    return etree.HTML(html_content, parser=parser)
+
 
+def _serialize(element):
+    """Serialize an lxml element as HTML, without the text following it"""
+    return etree.tostring(
+        element, method='html', encoding='unicode', with_tail=False
+    )
 
-def extract_article_content(html_content):
-    """Extract content from <article> tag if present, otherwise return original content"""
-    soup = BeautifulSoup(html_content, 'html.parser')
+
+def _drop_element(element):
+    """Remove an element and its content, keeping the text that follows it"""
+    parent = element.getparent()
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + element.tail
+        else:
+            parent.text = (parent.text or '') + element.tail
+    parent.remove(element)
+
+
+def extract_article_content(html_content, as_soup=False):
+    """
+    Extract content from <article> tag if present, otherwise return original content.
+
+    With as_soup=True the parsed element is returned instead of a string, so it
+    can be handed to clean_html without serializing and re-parsing it.
+    """
+    if not LXML_AVAILABLE:
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        article = soup.find('article')
+        if article:
+            return article if as_soup else str(article)
+        return soup if as_soup else html_content
+
+    tree = _parse_document(html_content)
+    if tree is None:
+        return html_content
 
     # Look for article tag
-    article = soup.find('article')
-    if article:
-        return str(article)
+    article = next(tree.iter('article'), None)
+    if article is not None:
+        return article if as_soup else _serialize(article)
 
     # If no article tag found, return the original content
-    return html_content
-
-
-def clean_html(html_content, unwanted_tags=None, unwanted_attrs=None):
-    """Clean HTML content by removing unwanted tags and attributes"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Default unwanted tags if not provided
-    if unwanted_tags is None:
-        unwanted_tags = [
-            'head', 'img', 'script', 'style', 'meta', 'link',
-            'noscript', 'iframe', 'embed', 'object'
-        ]
-
-    # Default unwanted attributes if not provided
-    if unwanted_attrs is None:
-        unwanted_attrs = [
-            'style', 'class', 'id', 'onclick', 'onload', 'onerror',
-            'data-(.*)', 'width', 'height', 'valign', 'role',
-            'align', 'cellspacing', 'border', 'cellpadding', 'aria-(.*)'
-        ]
-
-    # Remove unwanted tags completely (support regex patterns)
-    for tag_pattern in unwanted_tags:
-        if '*' in tag_pattern or '(' in tag_pattern:
-            # Regex pattern
-            regex = re.compile(tag_pattern.replace('*', '.*'))
-            for element in soup.find_all():
-                if element.name and regex.match(element.name):
-                    element.decompose()
-        else:
-            # Exact match
-            for element in soup.find_all(tag_pattern):
-                element.decompose()
-
-    # Remove unwanted attributes from all tags (support regex patterns)
-    for tag in soup.find_all():
-        for attr in list(tag.attrs.keys()):
-            should_remove = False
-            for attr_pattern in unwanted_attrs:
-                if '*' in attr_pattern or '(' in attr_pattern:
-                    # Regex pattern
-                    regex = re.compile(attr_pattern.replace('*', '.*'))
-                    if regex.match(attr):
-                        should_remove = True
-                        break
-                else:
-                    # Exact match
-                    if attr == attr_pattern:
-                        should_remove = True
-                        break
-
-            if should_remove:
-                del tag.attrs[attr]
-
-    # Remove empty tags
-    for tag in soup.find_all():
-        if (not tag.get_text(strip=True) and not tag.find_all()
-                and tag.name not in ['br', 'hr', 'img']):
-            tag.decompose()
-
-    return str(soup)
\ No newline at end of file
+    return tree if as_soup else html_content
+
+
+@functools.lru_cache(maxsize=64)
+def _split_patterns(patterns):
+    """
+    Split tag or attribute name patterns into exact names and one regex.
+
+    Patterns containing '*' or '(' are regexes, with '*' standing for '.*'.
+    They are joined into a single alternation so a name is tested with one
+    fullmatch call, and the result is cached per pattern tuple so repeated
+    requests with the same patterns do not compile anything. A pattern has
+    to match the whole name, so 'data-(x)' does not also remove 'data-xyz'.
+
+    Args:
+        patterns (tuple): Tag or attribute name patterns
+
+    Returns:
+        tuple: (frozenset of exact names, compiled regex or None)
+    """
+    exact = frozenset(p for p in patterns if '*' not in p and '(' not in p)
+    regexes = [p.replace('*', '.*') for p in patterns if p not in exact]
+    if not regexes:
+        return exact, None
+    return exact, re.compile('|'.join('(?:%s)' % regex for regex in regexes))
+
+
+def _matches(name, exact, regex):
+    """Check whether a tag or attribute name matches the split patterns"""
+    return name in exact or (regex is not None and regex.fullmatch(name) is not None)
+
+
+# Compile the default patterns at import time instead of on the first request
+_split_patterns(DEFAULT_UNWANTED_TAGS)
+_split_patterns(DEFAULT_UNWANTED_ATTRS)
+
+
+def clean_html(html_content, unwanted_tags=None, unwanted_attrs=None,
+               detect_article=False):
+    """
+    Clean HTML content by removing unwanted tags and attributes.
+
+    The HTML is parsed once; with detect_article=True cleaning continues on
+    the first <article> element of that tree, if there is one. Results for
+    str and bytes input are cached by content hash, so repeated payloads are
+    only cleaned once. Already parsed trees are always cleaned.
+
+    Args:
+        html_content: HTML as str or bytes, or a tree from extract_article_content
+        unwanted_tags (list): Tag name patterns to remove with their content
+        unwanted_attrs (list): Attribute name patterns to remove
+        detect_article (bool): Whether to keep only the <article> content
+
+    Returns:
+        str: The cleaned HTML
+    """
+    unwanted_tags = DEFAULT_UNWANTED_TAGS if unwanted_tags is None else tuple(unwanted_tags)
+    unwanted_attrs = DEFAULT_UNWANTED_ATTRS if unwanted_attrs is None else tuple(unwanted_attrs)
+    clean = _clean_tree if LXML_AVAILABLE else _clean_soup
+
+    if not isinstance(html_content, (str, bytes)):
+        return clean(html_content, unwanted_tags, unwanted_attrs, detect_article)
+
+    data = html_content
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    cache_key = make_cache_key(
+        'clean_html',
+        type(html_content).__name__,
+        hashlib.blake2b(data, digest_size=16).digest(),
+        unwanted_tags,
+        unwanted_attrs,
+        detect_article
+    )
+    cleaned_html = _clean_html_cache.get(cache_key)
+    if cleaned_html is None:
+        cleaned_html = clean(
+            html_content, unwanted_tags, unwanted_attrs, detect_article
+        )
+        # Multi-MB pages would pin a lot of memory for a rare repeat hit
+        if len(cleaned_html) <= CLEAN_HTML_CACHE_MAX_CHARS:
+            _clean_html_cache.set(cache_key, cleaned_html)
+    return cleaned_html
+
+
+def _clean_tree(html_content, unwanted_tags, unwanted_attrs, detect_article):
+    """clean_html implementation working on an lxml tree"""
+    if isinstance(html_content, (str, bytes)):
+        root = _parse_document(html_content)
+        if root is None:
+            return ''
+    else:
+        root = html_content
+
+    if detect_article:
+        root = next(root.iter('article'), root)
+
+    tags = _split_patterns(unwanted_tags)
+    attrs = _split_patterns(unwanted_attrs)
+
+    exact_tags, tag_regex = tags
+    exact_attrs, attr_regex = attrs
+
+    # Remove unwanted tags with exact names completely, keeping the text that
+    # follows them; lxml does this in C
+    if exact_tags:
+        etree.strip_elements(root, *exact_tags, with_tail=False)
+
+    # Everything else happens in one bottom-up walk: children are handled
+    # before their parents, so a parent left empty once its children are
+    # gone is removed too, and only leaves are ever checked for text
+    for element in reversed(list(root.iterdescendants(etree.Element))):
+        if tag_regex is not None and tag_regex.fullmatch(element.tag):
+            _drop_element(element)
+            continue
+
+        # Remove unwanted attributes; most tags have none
+        attrib = element.attrib
+        if attrib:
+            for attr in [
+                name for name in attrib
+                if name in exact_attrs
+                or (attr_regex is not None and attr_regex.fullmatch(name))
+            ]:
+                del attrib[attr]
+
+        # Remove empty tags
+        if (element.tag not in EMPTY_TAGS_TO_KEEP
+                and next(element.iterchildren(etree.Element), None) is None
+                and not ''.join(element.itertext()).strip()):
+            _drop_element(element)
+
+    # The walk covers descendants only, so clean the root's attributes too
+    for attr in [name for name in root.attrib if _matches(name, *attrs)]:
+        del root.attrib[attr]
+
+    return _serialize(root)
+
+
+def _clean_soup(html_content, unwanted_tags, unwanted_attrs, detect_article):
+    """clean_html implementation used when lxml is not installed"""
+    if isinstance(html_content, (str, bytes)):
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+    else:
+        soup = html_content
+
+    if detect_article:
+        soup = soup.find('article') or soup
+
+    tags = _split_patterns(unwanted_tags)
+    attrs = _split_patterns(unwanted_attrs)
+
+    # Remove unwanted tags and attributes and then empty tags in one
+    # bottom-up walk, checking for child tags before text so only leaves are
+    # searched for text
+    for element in reversed(soup.find_all()):
+        if _matches(element.name, *tags):
+            element.decompose()
+            continue
+
+        if element.attrs:
+            element.attrs = {
+                name: value for name, value in element.attrs.items()
+                if not _matches(name, *attrs)
+            }
+
+        if (element.name not in EMPTY_TAGS_TO_KEEP
+                and element.find(True, recursive=False) is None
+                and not element.get_text(strip=True)):
+            element.decompose()
+
+    # The walk covers descendants only, so clean the attributes of a parsed
+    # <article> passed in as the root too
+    if not isinstance(soup, BeautifulSoup):
+        soup.attrs = {
+            name: value for name, value in soup.attrs.items()
+            if not _matches(name, *attrs)
+        }
+
+    return str(soup)
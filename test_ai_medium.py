@@ -4,7 +4,7 @@ Test script for AI-powered Medium.com free reading link detection.
 """
 
 import os
-from browser_utils import handle_medium_com, find_free_reading_url_with_ai
+from shared.browser_utils import handle_medium_com, find_free_reading_url_with_ai
 
 def test_ai_medium_detection():
     """
@@ -85,6 +85,31 @@ def test_custom_attributes():
     else:
         print(f"Error: {response.status_code} - {response.text}")
 
+def test_xhtml_document():
+    """Test that XHTML with an XML encoding declaration is cleaned"""
+    print("\n=== Testing XHTML document with XML declaration ===")
+    
+    xhtml = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><title>XHTML Test</title></head>
+<body><p class="text">This is an XHTML paragraph.</p></body>
+</html>
+"""
+    
+    response = requests.post(
+        'http://localhost:5000/clean-html',
+        data=xhtml.encode('utf-8'),
+        headers={'Content-Type': 'text/html'}
+    )
+    
+    if response.status_code == 200:
+        result = response.json()
+        print("Success! Cleaned HTML:")
+        print(result['html'])
+    else:
+        print(f"Error: {response.status_code} - {response.text}")
+
 def test_convert_by_url_with_config():
     """Test convert-by-url endpoint with configuration"""
     print("\n=== Testing convert-by-url with configuration ===")
@@ -125,6 +150,7 @@ if __name__ == '__main__':
         test_default_behavior()
         test_custom_tags()
         test_custom_attributes()
+        test_xhtml_document()
         test_convert_by_url_with_config()
         
         print("\n=== All tests completed! ===")